@@ -0,0 +1,223 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.tenants import TENANT_NAME_RE, tenant_registry
+from app.timing import tenant_labels
+
+IN_FLIGHT = Gauge("admission_in_flight", "Requests currently admitted, by tenant", ["tenant"])
+QUEUE_DEPTH = Gauge("admission_queue_depth", "Requests waiting for a global in-flight slot")
+QUEUE_SECONDS = Histogram(
+    "admission_queue_seconds",
+    "Time admitted requests waited for a global in-flight slot",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+REJECTED = Counter("admission_rejected_total", "Requests shed by admission control", ["tenant", "reason"])
+
+# Liveness and scrapes must keep answering while tenants are being shed.
+EXEMPT_PATHS = frozenset({"/", "/health", "/metrics"})
+
+# Ids without a schema share one state, so rotating header values cannot grow
+# the per-tenant table.
+UNKNOWN_TENANT = ""
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _TenantState:
+    __slots__ = ("in_flight", "bucket")
+
+    def __init__(self, bucket: Optional[TokenBucket]):
+        self.in_flight = 0
+        self.bucket = bucket
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = 0,
+        max_queue: int = 0,
+        queue_timeout: float = 0.0,
+        tenant_max_in_flight: int = 0,
+        tenant_rate: float = 0.0,
+        tenant_burst: float = 0.0,
+        retry_after: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tenant_max_in_flight = tenant_max_in_flight
+        self.tenant_rate = tenant_rate
+        self.tenant_burst = max(tenant_burst, 1.0)
+        self.retry_after = retry_after
+        self._clock = clock
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._tenants: dict[str, _TenantState] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0 or self.tenant_max_in_flight > 0 or self.tenant_rate > 0
+
+    def _tenant(self, tenant: str, now: float) -> _TenantState:
+        state = self._tenants.get(tenant)
+        if state is None:
+            bucket = TokenBucket(self.tenant_rate, self.tenant_burst, now) if self.tenant_rate > 0 else None
+            state = self._tenants[tenant] = _TenantState(bucket)
+        return state
+
+    def _reject(self, tenant: str, status_code: int, reason: str, retry_after: float) -> Rejected:
+        REJECTED.labels(tenant=tenant_labels(tenant), reason=reason).inc()
+        return Rejected(status_code, reason, retry_after)
+
+    async def acquire(self, tenant: str) -> None:
+        now = self._clock()
+        state = self._tenant(tenant, now)
+
+        if self.tenant_max_in_flight and state.in_flight >= self.tenant_max_in_flight:
+            raise self._reject(tenant, 429, "tenant_concurrency", self.retry_after)
+        if state.bucket is not None:
+            wait = state.bucket.take(now)
+            if wait:
+                raise self._reject(tenant, 429, "tenant_rate", wait)
+
+        # Counted before queueing, so a tenant's waiters count toward its own limit.
+        state.in_flight += 1
+        try:
+            await self._acquire_slot(tenant)
+        except BaseException:
+            state.in_flight -= 1
+            raise
+        IN_FLIGHT.labels(tenant=tenant_labels(tenant)).inc()
+
+    def release(self, tenant: str) -> None:
+        state = self._tenants.get(tenant)
+        if state is not None:
+            state.in_flight -= 1
+        IN_FLIGHT.labels(tenant=tenant_labels(tenant)).dec()
+        self._release_slot()
+
+    async def _acquire_slot(self, tenant: str) -> None:
+        if not self.max_in_flight:
+            return
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue or self.queue_timeout <= 0:
+            raise self._reject(tenant, 503, "global_concurrency", self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        QUEUE_DEPTH.set(len(self._waiters))
+        started = self._clock()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            # The slot can be handed over in the same tick that the wait times
+            # out or is cancelled: pass it on.
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject(tenant, 503, "queue_timeout", self.retry_after) from None
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            QUEUE_DEPTH.set(len(self._waiters))
+        QUEUE_SECONDS.observe(self._clock() - started)
+
+    def _release_slot(self) -> None:
+        if not self.max_in_flight:
+            return
+        # Hand the slot straight to the oldest waiter instead of freeing it.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+
+admission = AdmissionController(
+    max_in_flight=settings.admission_max_in_flight,
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout_ms / 1000,
+    tenant_max_in_flight=settings.admission_tenant_max_in_flight,
+    tenant_rate=settings.admission_tenant_rate,
+    tenant_burst=settings.admission_tenant_burst,
+    retry_after=settings.admission_retry_after_seconds,
+)
+
+
+def _tenant_id(scope) -> str:
+    for key, value in scope.get("headers", ()):
+        if key == b"x-tenant-id":
+            return value.decode("latin-1").lower() or "public"
+    return "public"
+
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        controller = admission
+        if scope["type"] != "http" or not controller.enabled or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        tenant = _tenant_id(scope)
+        if not TENANT_NAME_RE.match(tenant):
+            await JSONResponse({"detail": "Invalid tenant id"}, status_code=400)(scope, receive, send)
+            return
+        if not tenant_registry.known(tenant):
+            tenant = UNKNOWN_TENANT
+
+        try:
+            await controller.acquire(tenant)
+        except Rejected as e:
+            detail = "Too many requests for tenant" if e.status_code == 429 else "Service overloaded"
+            response = JSONResponse(
+                {"detail": detail},
+                status_code=e.status_code,
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(tenant)
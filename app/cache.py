@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+from prometheus_client import Counter, Gauge
+
+CACHE_REQUESTS = Counter("cache_requests_total", "In-process cache lookups", ["cache", "result"])
+CACHE_EVICTIONS = Counter("cache_evictions_total", "In-process cache evictions", ["cache", "reason"])
+CACHE_SIZE = Gauge("cache_entries", "Entries held by in-process caches", ["cache"])
+SINGLEFLIGHT_SHARED = Counter(
+    "cache_singleflight_shared_total", "Lookups that joined an in-flight call for the same key", ["cache"]
+)
+
+MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = CACHE_REQUESTS.labels(cache=name, result="hit")
+        self._misses = CACHE_REQUESTS.labels(cache=name, result="miss")
+        self._size = CACHE_SIZE.labels(cache=name)
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def _lookup(self, key: Hashable, now: float) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._data[key]
+            CACHE_EVICTIONS.labels(cache=self.name, reason="expired").inc()
+            return MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable) -> Any:
+        if not self.enabled:
+            return MISSING
+        with self._lock:
+            value = self._lookup(key, self._clock())
+            self._size.set(len(self._data))
+        (self._misses if value is MISSING else self._hits).inc()
+        return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> tuple[dict, list]:
+        found, missing = {}, []
+        if not self.enabled:
+            return found, list(keys)
+        with self._lock:
+            now = self._clock()
+            for key in keys:
+                value = self._lookup(key, now)
+                if value is MISSING:
+                    missing.append(key)
+                else:
+                    found[key] = value
+            self._size.set(len(self._data))
+        self._hits.inc(len(found))
+        self._misses.inc(len(missing))
+        return found, missing
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: dict, ttl: float | None = None) -> None:
+        if not self.enabled or not items:
+            return
+        with self._lock:
+            expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+            for key, value in items.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            evicted = 0
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+            self._size.set(len(self._data))
+        if evicted:
+            CACHE_EVICTIONS.labels(cache=self.name, reason="size").inc(evicted)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._size.set(len(self._data))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._size.set(0)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._shared = SINGLEFLIGHT_SHARED.labels(cache=name)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._shared.inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,157 @@
+import argparse
+import sys
+from contextlib import nullcontext
+
+from app.config import settings
+from app.database import engine, get_db_session
+from app.migrations import LATEST_VERSION, all_schemas, migrate_all, provision_tenant
+from app.leaderboard import refresh_leaderboard
+from app.ratings import rebuild_ratings
+from app.trends import rebuild_rollups
+from app.report import aggregate_schemas, report_chunks, report_lines
+
+
+def cmd_rebuild_ratings(args) -> int:
+    for schema in args.schema:
+        with get_db_session(schema=schema) as db:
+            partners = rebuild_ratings(db)
+            db.commit()
+        print(f"{schema}: rebuilt ratings for {partners} partners")
+    return 0
+
+
+def cmd_rebuild_rollups(args) -> int:
+    for schema in args.schema or all_schemas(engine):
+        with get_db_session(schema=schema) as db:
+            buckets = rebuild_rollups(db)
+            db.commit()
+        print(f"{schema}: rebuilt {buckets} rating trend buckets")
+    return 0
+
+
+def cmd_refresh_leaderboard(args) -> int:
+    for schema in args.schema or all_schemas(engine):
+        with get_db_session(schema=schema) as db:
+            partners = refresh_leaderboard(db)
+            db.commit()
+        print(f"{schema}: refreshed leaderboard scores for {partners} partners")
+    return 0
+
+
+def _describe(applied) -> str:
+    if not applied:
+        return f"up to date (version {LATEST_VERSION})"
+    return f"applied {', '.join(map(str, applied))}"
+
+
+def cmd_migrate(args) -> int:
+    schemas = args.schema or all_schemas(engine)
+    done = 0
+
+    def progress(schema, applied, error):
+        nonlocal done
+        done += 1
+        outcome = f"FAILED: {error}" if error else _describe(applied)
+        print(f"[{done}/{len(schemas)}] {schema}: {outcome}", flush=True)
+
+    results = migrate_all(engine, schemas, concurrency=args.concurrency, progress=progress)
+    failed = [schema for schema, result in results.items() if isinstance(result, BaseException)]
+    if failed:
+        print(f"{len(failed)} schema(s) failed: {', '.join(sorted(failed))}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_ratings_report(args) -> int:
+    schemas = args.schema or all_schemas(engine)
+    done, failed = 0, []
+
+    def progress(schema, rows):
+        nonlocal done
+        done += 1
+        if isinstance(rows, BaseException):
+            failed.append(schema)
+            outcome = f"FAILED: {rows}"
+        else:
+            outcome = f"{len(rows)} partners"
+        print(f"[{done}/{len(schemas)}] {schema}: {outcome}", file=sys.stderr, flush=True)
+
+    records = report_lines(aggregate_schemas(engine, schemas, args.concurrency), progress=progress)
+    with open(args.output, "wb") if args.output else nullcontext(sys.stdout.buffer) as out:
+        for chunk in report_chunks(records):
+            out.write(chunk)
+    if failed:
+        print(f"{len(failed)} schema(s) failed: {', '.join(sorted(failed))}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_provision_tenant(args) -> int:
+    try:
+        applied = provision_tenant(engine, args.name)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"{args.name}: {_describe(applied)}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Review service maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-ratings", help="Recompute partner_ratings from the reviews table")
+    rebuild.add_argument("--schema", action="append", default=None, help="Tenant schema (repeatable, default: public)")
+    rebuild.set_defaults(func=cmd_rebuild_ratings)
+
+    rollups = commands.add_parser(
+        "rebuild-rollups", help="Recompute the day/week/month rating trend buckets from the reviews table"
+    )
+    rollups.add_argument(
+        "--schema", action="append", default=None, help="Tenant schema (repeatable, default: every tenant schema)"
+    )
+    rollups.set_defaults(func=cmd_rebuild_rollups)
+
+    leaderboard = commands.add_parser(
+        "refresh-leaderboard", help="Recompute the leaderboard prior and every partner's scores"
+    )
+    leaderboard.add_argument(
+        "--schema", action="append", default=None, help="Tenant schema (repeatable, default: every tenant schema)"
+    )
+    leaderboard.set_defaults(func=cmd_refresh_leaderboard)
+
+    migrate = commands.add_parser("migrate", help="Apply pending schema migrations")
+    migrate.add_argument(
+        "--schema", action="append", default=None, help="Tenant schema (repeatable, default: every tenant schema)"
+    )
+    migrate.add_argument(
+        "--concurrency", type=int, default=settings.migration_concurrency, help="Schemas migrated in parallel"
+    )
+    migrate.set_defaults(func=cmd_migrate)
+
+    report = commands.add_parser("ratings-report", help="Aggregate partner ratings across tenant schemas as NDJSON")
+    report.add_argument(
+        "--schema", action="append", default=None, help="Tenant schema (repeatable, default: every tenant schema)"
+    )
+    report.add_argument(
+        "--concurrency", type=int, default=settings.report_concurrency, help="Schemas aggregated in parallel"
+    )
+    report.add_argument("--output", default=None, help="Write the report to this file instead of stdout")
+    report.set_defaults(func=cmd_ratings_report)
+
+    provision = commands.add_parser("provision-tenant", help="Create a tenant schema at the current version")
+    provision.add_argument("name", help="Tenant schema name")
+    provision.set_defaults(func=cmd_provision_tenant)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "rebuild-ratings" and args.schema is None:
+        args.schema = ["public"]
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
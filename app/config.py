@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,6 +10,92 @@ class Settings(BaseSettings):
     pg_port: int = Field(5432, validation_alias="PGPORT")
     pg_database: str = Field(validation_alias="PGDATABASE")
 
+    # Optional read replica; unset fields default to the primary's values.
+    replica_pg_host: Optional[str] = Field(None, validation_alias="REPLICA_PGHOST")
+    replica_pg_port: Optional[int] = Field(None, validation_alias="REPLICA_PGPORT")
+    replica_pg_user: Optional[str] = Field(None, validation_alias="REPLICA_PGUSER")
+    replica_pg_password: Optional[str] = Field(None, validation_alias="REPLICA_PGPASSWORD")
+    replica_pg_database: Optional[str] = Field(None, validation_alias="REPLICA_PGDATABASE")
+    replica_max_lag_seconds: float = Field(5.0, ge=0, validation_alias="REPLICA_MAX_LAG_SECONDS")
+    replica_check_interval_seconds: float = Field(2.0, ge=0, validation_alias="REPLICA_CHECK_INTERVAL_SECONDS")
+    replica_connect_timeout_seconds: int = Field(2, ge=1, validation_alias="REPLICA_CONNECT_TIMEOUT_SECONDS")
+    read_your_writes_seconds: float = Field(5.0, ge=0, validation_alias="READ_YOUR_WRITES_SECONDS")
+
+    # Covers POST /reviews and /health only; every other endpoint is always sync.
+    db_mode: Literal["sync", "async"] = Field("sync", validation_alias="DB_MODE")
+    db_pool_size: int = Field(10, ge=1, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(20, ge=0, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30.0, gt=0, validation_alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(1800, validation_alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(True, validation_alias="DB_POOL_PRE_PING")
+
+    tenant_registry_ttl_seconds: float = Field(300.0, ge=0, validation_alias="TENANT_REGISTRY_TTL_SECONDS")
+    tenant_registry_miss_refresh_seconds: float = Field(
+        5.0, ge=0, validation_alias="TENANT_REGISTRY_MISS_REFRESH_SECONDS"
+    )
+
+    orders_grpc_host: str = Field("order-service", validation_alias="ORDERS_GRPC_HOST")
+    orders_grpc_port: int = Field(50051, validation_alias="ORDERS_GRPC_PORT")
+    orders_grpc_channels: int = Field(2, ge=1, validation_alias="ORDERS_GRPC_CHANNELS")
+    orders_grpc_keepalive_ms: int = Field(30000, validation_alias="ORDERS_GRPC_KEEPALIVE_MS")
+    orders_grpc_keepalive_timeout_ms: int = Field(10000, validation_alias="ORDERS_GRPC_KEEPALIVE_TIMEOUT_MS")
+    orders_grpc_initial_backoff_ms: int = Field(1000, validation_alias="ORDERS_GRPC_INITIAL_BACKOFF_MS")
+    orders_grpc_max_backoff_ms: int = Field(30000, validation_alias="ORDERS_GRPC_MAX_BACKOFF_MS")
+    orders_grpc_fanout: int = Field(16, ge=1, validation_alias="ORDERS_GRPC_FANOUT")
+    orders_grpc_deadline_ms: int = Field(2000, gt=0, validation_alias="ORDERS_GRPC_DEADLINE_MS")
+    orders_grpc_max_attempts: int = Field(3, ge=1, validation_alias="ORDERS_GRPC_MAX_ATTEMPTS")
+    orders_grpc_retry_backoff_ms: int = Field(50, ge=0, validation_alias="ORDERS_GRPC_RETRY_BACKOFF_MS")
+    orders_grpc_retry_max_backoff_ms: int = Field(1000, ge=0, validation_alias="ORDERS_GRPC_RETRY_MAX_BACKOFF_MS")
+    orders_grpc_hedge_delay_ms: int = Field(0, ge=0, validation_alias="ORDERS_GRPC_HEDGE_DELAY_MS")
+    orders_grpc_breaker_failures: int = Field(5, ge=0, validation_alias="ORDERS_GRPC_BREAKER_FAILURES")
+    orders_grpc_breaker_reset_seconds: float = Field(
+        10.0, gt=0, validation_alias="ORDERS_GRPC_BREAKER_RESET_SECONDS"
+    )
+
+    rating_cache_size: int = Field(10000, ge=0, validation_alias="RATING_CACHE_SIZE")
+    rating_cache_ttl_seconds: float = Field(30.0, ge=0, validation_alias="RATING_CACHE_TTL_SECONDS")
+
+    partner_cache_max_age_seconds: int = Field(0, ge=0, validation_alias="PARTNER_CACHE_MAX_AGE_SECONDS")
+
+    leaderboard_prior_weight: float = Field(10.0, ge=0, validation_alias="LEADERBOARD_PRIOR_WEIGHT")
+    leaderboard_half_life_days: float = Field(90.0, gt=0, validation_alias="LEADERBOARD_HALF_LIFE_DAYS")
+
+    review_batch_max: int = Field(1000, ge=1, validation_alias="REVIEW_BATCH_MAX")
+    review_lookup_max: int = Field(1000, ge=1, validation_alias="REVIEW_LOOKUP_MAX")
+
+    order_cache_size: int = Field(50000, ge=0, validation_alias="ORDER_CACHE_SIZE")
+    order_cache_ttl_seconds: float = Field(300.0, ge=0, validation_alias="ORDER_CACHE_TTL_SECONDS")
+    order_cache_negative_ttl_seconds: float = Field(30.0, ge=0, validation_alias="ORDER_CACHE_NEGATIVE_TTL_SECONDS")
+
+    server_timing_enabled: bool = Field(False, validation_alias="SERVER_TIMING_ENABLED")
+    metrics_max_tenants: int = Field(50, ge=0, validation_alias="METRICS_MAX_TENANTS")
+
+    export_batch_size: int = Field(5000, ge=1, validation_alias="EXPORT_BATCH_SIZE")
+    report_concurrency: int = Field(4, ge=1, validation_alias="REPORT_CONCURRENCY")
+
+    write_behind_enabled: bool = Field(False, validation_alias="WRITE_BEHIND_ENABLED")
+    write_behind_queue_size: int = Field(10000, ge=1, validation_alias="WRITE_BEHIND_QUEUE_SIZE")
+    write_behind_batch_size: int = Field(500, ge=1, validation_alias="WRITE_BEHIND_BATCH_SIZE")
+    write_behind_linger_ms: int = Field(20, ge=0, validation_alias="WRITE_BEHIND_LINGER_MS")
+    write_behind_spill_path: Optional[str] = Field(None, validation_alias="WRITE_BEHIND_SPILL_PATH")
+    write_behind_fsync: bool = Field(False, validation_alias="WRITE_BEHIND_FSYNC")
+    write_behind_max_attempts: int = Field(10, ge=1, validation_alias="WRITE_BEHIND_MAX_ATTEMPTS")
+    write_behind_dead_letter_path: Optional[str] = Field(None, validation_alias="WRITE_BEHIND_DEAD_LETTER_PATH")
+    write_behind_retry_after_seconds: int = Field(1, ge=0, validation_alias="WRITE_BEHIND_RETRY_AFTER_SECONDS")
+    write_behind_drain_timeout_seconds: float = Field(30.0, ge=0, validation_alias="WRITE_BEHIND_DRAIN_TIMEOUT_SECONDS")
+
+    # Admission control; a limit of 0 disables it.
+    admission_max_in_flight: int = Field(0, ge=0, validation_alias="ADMISSION_MAX_IN_FLIGHT")
+    admission_max_queue: int = Field(0, ge=0, validation_alias="ADMISSION_MAX_QUEUE")
+    admission_queue_timeout_ms: int = Field(50, ge=0, validation_alias="ADMISSION_QUEUE_TIMEOUT_MS")
+    admission_tenant_max_in_flight: int = Field(0, ge=0, validation_alias="ADMISSION_TENANT_MAX_IN_FLIGHT")
+    admission_tenant_rate: float = Field(0.0, ge=0, validation_alias="ADMISSION_TENANT_RATE")
+    admission_tenant_burst: float = Field(0.0, ge=0, validation_alias="ADMISSION_TENANT_BURST")
+    admission_retry_after_seconds: int = Field(1, ge=1, validation_alias="ADMISSION_RETRY_AFTER_SECONDS")
+
+    migration_concurrency: int = Field(4, ge=1, validation_alias="MIGRATION_CONCURRENCY")
+    schema_version_check: Literal["error", "warn", "off"] = Field("error", validation_alias="SCHEMA_VERSION_CHECK")
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
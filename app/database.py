@@ -1,24 +1,93 @@
-from sqlalchemy import create_engine, text
+from typing import Optional
+
+from sqlalchemy import Connection, Engine, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.config import settings
-from contextlib import contextmanager
+from app.timing import instrument_engine, phase
+from contextlib import asynccontextmanager, contextmanager
 
 DATABASE_URL = (
     f"postgresql://{settings.pg_user}:{settings.pg_password}"
     f"@{settings.pg_host}:{settings.pg_port}/{settings.pg_database}"
 )
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+REPLICA_DATABASE_URL = (
+    f"postgresql://{settings.replica_pg_user or settings.pg_user}:"
+    f"{settings.replica_pg_password or settings.pg_password}"
+    f"@{settings.replica_pg_host}:{settings.replica_pg_port or settings.pg_port}"
+    f"/{settings.replica_pg_database or settings.pg_database}"
+) if settings.replica_pg_host else None
+
+POOL_OPTIONS = dict(
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+)
 
-engine = create_engine(DATABASE_URL)
+# Pooled connections remember the schema they were last pointed at, so the
+# SET search_path round trip is only paid when a connection changes tenant.
+SEARCH_PATH_KEY = "search_path"
+
+engine = create_engine(DATABASE_URL, **POOL_OPTIONS)
+replica_engine = create_engine(
+    REPLICA_DATABASE_URL,
+    connect_args={"connect_timeout": settings.replica_connect_timeout_seconds},
+    **POOL_OPTIONS,
+) if REPLICA_DATABASE_URL else None
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **POOL_OPTIONS) if settings.db_mode == "async" else None
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 class Base(DeclarativeBase):
     pass
 
+def _forget_search_path(dbapi_connection, connection_record):
+    connection_record.info.pop(SEARCH_PATH_KEY, None)
+
+event.listen(engine, "connect", _forget_search_path)
+instrument_engine(engine)
+if replica_engine is not None:
+    event.listen(replica_engine, "connect", _forget_search_path)
+    instrument_engine(replica_engine)
+if async_engine is not None:
+    event.listen(async_engine.sync_engine, "connect", _forget_search_path)
+    instrument_engine(async_engine.sync_engine)
+
+def set_search_path(conn: Connection, schema: str) -> None:
+    if conn.info.get(SEARCH_PATH_KEY) == schema:
+        return
+    quoted = conn.dialect.identifier_preparer.quote_identifier(schema)
+    with phase("search_path"):
+        conn.exec_driver_sql(f"SET search_path TO {quoted}")
+        # Committed right away: a rolled back SET would silently revert the
+        # connection while its tag still names the tenant.
+        conn.commit()
+    conn.info[SEARCH_PATH_KEY] = schema
+
+# Sessions are bound to one connection so the search_path holds across
+# commits (statements after a commit must not land on another tenant's connection).
 @contextmanager
-def get_db_session(schema: str = None):
-    session = SessionLocal()
-    try:
-        session.execute(text(f"SET search_path TO {schema}"))
-        yield session
-    finally:
-        session.close()
+def get_db_session(schema: str = "public", bind: Optional[Engine] = None):
+    with (bind or engine).connect() as conn:
+        set_search_path(conn, schema)
+        session = SessionLocal(bind=conn)
+        try:
+            yield session
+        finally:
+            session.close()
+
+@asynccontextmanager
+async def get_async_db_session(schema: str = "public"):
+    async with async_engine.connect() as conn:
+        await conn.run_sync(set_search_path, schema)
+        session = AsyncSessionLocal(bind=conn)
+        try:
+            yield session
+        finally:
+            await session.close()
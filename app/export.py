@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select
+
+from app.database import get_db_session
+from app.models import Review
+
+EXPORT_COLUMNS = ["id", "order_id", "user_id", "partner_id", "rating", "comment", "created_at", "updated_at"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iter_review_batches(
+    schema: str,
+    batch_size: int,
+    partner_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Iterator[list]:
+    stmt = select(*(getattr(Review, c) for c in EXPORT_COLUMNS)).order_by(Review.created_at, Review.id)
+    if partner_id is not None:
+        stmt = stmt.where(Review.partner_id == partner_id)
+    if created_from is not None:
+        stmt = stmt.where(Review.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Review.created_at < created_to)
+
+    # Opened inside the generator so the session lives exactly as long as the
+    # response body is being streamed; yield_per uses a server-side cursor.
+    with get_db_session(schema=schema) as db:
+        result = db.execute(stmt, execution_options={"yield_per": batch_size})
+        for partition in result.partitions():
+            yield partition
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def ndjson_chunks(batches: Iterable[list]) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(
+            json.dumps({c: _value(v) for c, v in zip(EXPORT_COLUMNS, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode()
+
+
+def csv_chunks(batches: Iterable[list]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows([_value(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,120 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+import grpc
+from prometheus_client import Histogram
+
+from app.config import settings
+
+GRPC_CALL_LATENCY = Histogram(
+    "grpc_client_call_duration_seconds",
+    "Latency of outgoing gRPC calls",
+    ["target", "method", "code"],
+)
+
+
+def channel_options() -> list[tuple[str, int]]:
+    return [
+        ("grpc.keepalive_time_ms", settings.orders_grpc_keepalive_ms),
+        ("grpc.keepalive_timeout_ms", settings.orders_grpc_keepalive_timeout_ms),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.initial_reconnect_backoff_ms", settings.orders_grpc_initial_backoff_ms),
+        ("grpc.min_reconnect_backoff_ms", settings.orders_grpc_initial_backoff_ms),
+        ("grpc.max_reconnect_backoff_ms", settings.orders_grpc_max_backoff_ms),
+    ]
+
+
+class ChannelPool:
+    def __init__(self, target: str, size: int = 1, options=None, factory=grpc.insecure_channel):
+        self.target = target
+        self.size = max(1, size)
+        self._options = list(options or [])
+        self._factory = factory
+        self._channels: list[grpc.Channel] = []
+        self._cycle = None
+        self._lock = threading.Lock()
+
+    def get(self) -> grpc.Channel:
+        cycle = self._cycle
+        if cycle is None:
+            with self._lock:
+                if self._cycle is None:
+                    self._channels = [
+                        self._factory(self.target, options=self._options) for _ in range(self.size)
+                    ]
+                    self._cycle = itertools.cycle(self._channels)
+                cycle = self._cycle
+        return next(cycle)
+
+    def close(self) -> None:
+        with self._lock:
+            channels, self._channels, self._cycle = self._channels, [], None
+        for channel in channels:
+            channel.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            channels, self._channels, self._cycle = self._channels, [], None
+        for channel in channels:
+            await channel.close()
+
+
+class ChannelManager:
+    def __init__(self, size: int = 1, options=None, factory=grpc.insecure_channel):
+        self.size = size
+        self._options = options
+        self._factory = factory
+        self._pools: dict[str, ChannelPool] = {}
+        self._lock = threading.Lock()
+
+    def pool(self, target: str) -> ChannelPool:
+        pool = self._pools.get(target)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(target)
+                if pool is None:
+                    pool = ChannelPool(target, self.size, self._options, self._factory)
+                    self._pools[target] = pool
+        return pool
+
+    def channel(self, target: str) -> grpc.Channel:
+        return self.pool(target).get()
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            await pool.aclose()
+
+
+@contextmanager
+def observe_call(target: str, method: str):
+    start = time.perf_counter()
+    code = grpc.StatusCode.OK
+    try:
+        yield
+    except grpc.RpcError as e:
+        code = e.code() if callable(getattr(e, "code", None)) else grpc.StatusCode.UNKNOWN
+        raise
+    except Exception:
+        code = grpc.StatusCode.UNKNOWN
+        raise
+    finally:
+        GRPC_CALL_LATENCY.labels(target=target, method=method, code=code.name).observe(
+            time.perf_counter() - start
+        )
+
+
+channel_manager = ChannelManager(size=settings.orders_grpc_channels, options=channel_options())
+aio_channel_manager = ChannelManager(
+    size=settings.orders_grpc_channels, options=channel_options(), factory=grpc.aio.insecure_channel
+)
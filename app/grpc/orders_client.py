@@ -1,18 +1,83 @@
-import os
+from concurrent.futures import ThreadPoolExecutor
+
 import grpc
+
+from app.config import settings
 from app.grpc import orders_pb2, orders_pb2_grpc
+from app.grpc.channels import aio_channel_manager, channel_manager
+from app.grpc.resilience import CircuitBreaker, ResilientCaller
+
+ORDERS_GRPC_TARGET = f"{settings.orders_grpc_host}:{settings.orders_grpc_port}"
 
-ORDERS_GRPC_HOST = os.getenv("ORDERS_GRPC_HOST", "order-service")
-ORDERS_GRPC_PORT = int(os.getenv("ORDERS_GRPC_PORT", "50051"))
+orders_breaker = CircuitBreaker(
+    ORDERS_GRPC_TARGET,
+    failure_threshold=settings.orders_grpc_breaker_failures,
+    reset_timeout=settings.orders_grpc_breaker_reset_seconds,
+)
+orders_caller = ResilientCaller(
+    ORDERS_GRPC_TARGET,
+    orders_breaker,
+    deadline=settings.orders_grpc_deadline_ms / 1000,
+    max_attempts=settings.orders_grpc_max_attempts,
+    initial_backoff=settings.orders_grpc_retry_backoff_ms / 1000,
+    max_backoff=settings.orders_grpc_retry_max_backoff_ms / 1000,
+    hedge_delay=settings.orders_grpc_hedge_delay_ms / 1000 if settings.orders_grpc_hedge_delay_ms else None,
+)
 
 def get_order_by_id(order_id: int, tenant_id: str | None = None):
-    target = f"{ORDERS_GRPC_HOST}:{ORDERS_GRPC_PORT}"
     metadata = [("x-tenant-id", (tenant_id or "public"))]
+    stub = orders_pb2_grpc.OrdersServiceStub(channel_manager.channel(ORDERS_GRPC_TARGET))
+
+    return orders_caller.call(
+        "GetOrderById",
+        stub.GetOrderById,
+        orders_pb2.GetOrderByIdRequest(order_id=order_id),
+        metadata=metadata,
+    )
+
+async def get_order_by_id_async(order_id: int, tenant_id: str | None = None):
+    metadata = [("x-tenant-id", (tenant_id or "public"))]
+    stub = orders_pb2_grpc.OrdersServiceStub(aio_channel_manager.channel(ORDERS_GRPC_TARGET))
 
-    with grpc.insecure_channel(target) as channel:
-        stub = orders_pb2_grpc.OrdersServiceStub(channel)
+    return await orders_caller.acall(
+        "GetOrderById",
+        stub.GetOrderById,
+        orders_pb2.GetOrderByIdRequest(order_id=order_id),
+        metadata=metadata,
+    )
 
-        return stub.GetOrderById(
-            orders_pb2.GetOrderByIdRequest(order_id=order_id),
+def _get_order_or_none(order_id: int, tenant_id: str | None):
+    try:
+        resp = get_order_by_id(order_id, tenant_id)
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.NOT_FOUND:
+            return None
+        raise
+    return resp.order if resp and resp.HasField("order") else None
+
+def get_orders_by_ids(order_ids: list[int], tenant_id: str | None = None) -> dict:
+    metadata = [("x-tenant-id", (tenant_id or "public"))]
+    stub = orders_pb2_grpc.OrdersServiceStub(channel_manager.channel(ORDERS_GRPC_TARGET))
+
+    try:
+        resp = orders_caller.call(
+            "GetOrdersByIds",
+            stub.GetOrdersByIds,
+            orders_pb2.GetOrdersByIdsRequest(order_ids=order_ids),
             metadata=metadata,
         )
+        return {order.id: order for order in resp.orders}
+    except grpc.RpcError as e:
+        if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+            raise
+
+    # Orders Service without the batched RPC: fan out single lookups.
+    with ThreadPoolExecutor(max_workers=min(settings.orders_grpc_fanout, len(order_ids) or 1)) as pool:
+        orders = pool.map(lambda oid: _get_order_or_none(oid, tenant_id), order_ids)
+        return {oid: order for oid, order in zip(order_ids, orders) if order is not None}
+
+def close_channels():
+    channel_manager.close()
+
+async def aclose_channels():
+    await aio_channel_manager.aclose()
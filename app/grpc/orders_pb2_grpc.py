@@ -3,7 +3,7 @@
 import grpc
 import warnings
 
-import orders_pb2 as orders__pb2
+from . import orders_pb2 as orders__pb2
 
 GRPC_GENERATED_VERSION = '1.76.0'
 GRPC_VERSION = grpc.__version__
@@ -44,6 +44,11 @@ class OrdersServiceStub(object):
                 request_serializer=orders__pb2.GetOrderByIdRequest.SerializeToString,
                 response_deserializer=orders__pb2.GetOrderByIdResponse.FromString,
                 _registered_method=True)
+        self.GetOrdersByIds = channel.unary_unary(
+                '/orders.v1.OrdersService/GetOrdersByIds',
+                request_serializer=orders__pb2.GetOrdersByIdsRequest.SerializeToString,
+                response_deserializer=orders__pb2.GetOrdersByIdsResponse.FromString,
+                _registered_method=True)
 
 
 class OrdersServiceServicer(object):
@@ -61,6 +66,12 @@ class OrdersServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetOrdersByIds(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_OrdersServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -74,6 +85,11 @@ def add_OrdersServiceServicer_to_server(servicer, server):
                     request_deserializer=orders__pb2.GetOrderByIdRequest.FromString,
                     response_serializer=orders__pb2.GetOrderByIdResponse.SerializeToString,
             ),
+            'GetOrdersByIds': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetOrdersByIds,
+                    request_deserializer=orders__pb2.GetOrdersByIdsRequest.FromString,
+                    response_serializer=orders__pb2.GetOrdersByIdsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'orders.v1.OrdersService', rpc_method_handlers)
@@ -138,3 +154,30 @@ class OrdersService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetOrdersByIds(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/orders.v1.OrdersService/GetOrdersByIds',
+            orders__pb2.GetOrdersByIdsRequest.SerializeToString,
+            orders__pb2.GetOrdersByIdsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,260 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import grpc
+from prometheus_client import Counter, Gauge
+
+from app.grpc.channels import observe_call
+
+BREAKER_STATE = Gauge(
+    "grpc_client_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["target"]
+)
+BREAKER_TRANSITIONS = Counter(
+    "grpc_client_circuit_transitions_total", "Circuit breaker state changes", ["target", "state"]
+)
+BREAKER_REJECTED = Counter(
+    "grpc_client_circuit_rejected_total", "Calls failed fast by an open circuit", ["target"]
+)
+RETRIES = Counter("grpc_client_retries_total", "Retried gRPC attempts", ["target", "method", "code"])
+HEDGES = Counter("grpc_client_hedges_total", "Hedged gRPC attempts", ["target", "method", "result"])
+
+# Codes that say nothing about the upstream's health are not counted as failures.
+FAILURE_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.UNKNOWN,
+})
+RETRYABLE_CODES = frozenset({grpc.StatusCode.UNAVAILABLE})
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(Exception):
+    def __init__(self, target: str, retry_after: float):
+        super().__init__(f"Circuit open for {target}")
+        self.target = target
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        target: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.target = target
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        BREAKER_STATE.labels(target=target).set(0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        BREAKER_STATE.labels(target=self.target).set(_STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(target=self.target, state=state).inc()
+
+    def before_call(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._state == OPEN:
+                waited = self._clock() - self._opened_at
+                if waited < self.reset_timeout:
+                    BREAKER_REJECTED.labels(target=self.target).inc()
+                    raise CircuitOpen(self.target, self.reset_timeout - waited)
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                # A single probe decides whether the circuit closes again.
+                if self._probing:
+                    BREAKER_REJECTED.labels(target=self.target).inc()
+                    raise CircuitOpen(self.target, self.reset_timeout)
+                self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                if self._state != OPEN:
+                    self._transition(OPEN)
+
+    def record(self, error: Optional[BaseException]) -> None:
+        if isinstance(error, grpc.RpcError) and error.code() in FAILURE_CODES:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+# Wraps unary-unary multi-callables (stub.Method); all attempts of one logical
+# call share a single deadline budget.
+class ResilientCaller:
+    def __init__(
+        self,
+        target: str,
+        breaker: CircuitBreaker,
+        deadline: float,
+        max_attempts: int = 3,
+        initial_backoff: float = 0.05,
+        max_backoff: float = 1.0,
+        hedge_delay: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.target = target
+        self.breaker = breaker
+        self.deadline = deadline
+        self.max_attempts = max(1, max_attempts)
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.hedge_delay = hedge_delay
+        self._sleep = sleep
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.initial_backoff * 2 ** attempt))
+
+    def _retry_delay(self, method: str, error: grpc.RpcError, attempt: int, deadline: float) -> Optional[float]:
+        if error.code() not in RETRYABLE_CODES or attempt + 1 >= self.max_attempts:
+            return None
+        delay = self._backoff(attempt)
+        if time.monotonic() + delay >= deadline:
+            return None
+        RETRIES.labels(target=self.target, method=method, code=error.code().name).inc()
+        return delay
+
+    def call(self, method: str, fn, request, metadata=None) -> Any:
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                with observe_call(self.target, method):
+                    result = self._invoke(method, fn, request, metadata, deadline - time.monotonic())
+            except grpc.RpcError as e:
+                self.breaker.record(e)
+                delay = self._retry_delay(method, e, attempt, deadline)
+                if delay is None:
+                    raise
+                self._sleep(delay)
+                attempt += 1
+                continue
+            except Exception as e:
+                self.breaker.record(e)
+                raise
+            self.breaker.record_success()
+            return result
+
+    def _invoke(self, method: str, fn, request, metadata, timeout: float) -> Any:
+        if not self.hedge_delay or self.hedge_delay >= timeout:
+            return fn(request, timeout=timeout, metadata=metadata)
+
+        primary = fn.future(request, timeout=timeout, metadata=metadata)
+        try:
+            return primary.result(timeout=self.hedge_delay)
+        except grpc.FutureTimeoutError:
+            pass
+
+        HEDGES.labels(target=self.target, method=method, result="sent").inc()
+        hedge = fn.future(request, timeout=timeout - self.hedge_delay, metadata=metadata)
+        done = threading.Event()
+        primary.add_done_callback(lambda _: done.set())
+        hedge.add_done_callback(lambda _: done.set())
+
+        pending = [primary, hedge]
+        error = None
+        while pending:
+            done.wait()
+            done.clear()
+            for future in [f for f in pending if f.done()]:
+                pending.remove(future)
+                try:
+                    result = future.result()
+                except grpc.RpcError as e:
+                    error = e
+                    continue
+                for other in pending:
+                    other.cancel()
+                if future is hedge:
+                    HEDGES.labels(target=self.target, method=method, result="won").inc()
+                return result
+        raise error
+
+    async def acall(self, method: str, fn, request, metadata=None) -> Any:
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                with observe_call(self.target, method):
+                    result = await self._ainvoke(method, fn, request, metadata, deadline - time.monotonic())
+            except grpc.RpcError as e:
+                self.breaker.record(e)
+                delay = self._retry_delay(method, e, attempt, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except Exception as e:
+                self.breaker.record(e)
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def _ainvoke(self, method: str, fn, request, metadata, timeout: float) -> Any:
+        if not self.hedge_delay or self.hedge_delay >= timeout:
+            return await fn(request, timeout=timeout, metadata=metadata)
+
+        primary = asyncio.ensure_future(fn(request, timeout=timeout, metadata=metadata))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+        if done:
+            return primary.result()
+
+        HEDGES.labels(target=self.target, method=method, result="sent").inc()
+        hedge = asyncio.ensure_future(fn(request, timeout=timeout - self.hedge_delay, metadata=metadata))
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                for other in pending:
+                    other.cancel()
+                if task is hedge:
+                    HEDGES.labels(target=self.target, method=method, result="won").inc()
+                return task.result()
+        raise error
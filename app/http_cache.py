@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import PartnerRating
+
+
+def partner_version(db: Session, partner_id: str) -> tuple[int, Optional[datetime]]:
+    row = db.execute(
+        select(PartnerRating.version, PartnerRating.updated_at).where(PartnerRating.partner_id == partner_id)
+    ).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def cache_headers(version: int, updated_at: Optional[datetime]) -> dict[str, str]:
+    headers = {
+        "ETag": f'"{version}"',
+        "Cache-Control": f"public, max-age={settings.partner_cache_max_age_seconds}, must-revalidate",
+        # The tenant is chosen by header, so shared caches must key on it.
+        "Vary": "X-Tenant-Id",
+    }
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes added by proxies are ignored.
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified(request: Request, headers: dict[str, str]) -> Optional[Response]:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, headers["ETag"])
+    elif "if-modified-since" in request.headers and "Last-Modified" in headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return None
+        fresh = parsedate_to_datetime(headers["Last-Modified"]) <= since
+    else:
+        return None
+    return Response(status_code=304, headers=headers) if fresh else None
@@ -0,0 +1,124 @@
+import math
+import time
+from typing import Optional
+
+from sqlalchemy import exists, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.models import UTC_NOW, LeaderboardPrior, PartnerRating
+
+# Forward decay: a review at time t carries weight exp((t - epoch) / tau).
+# Scores are ratios, so any epoch works. Each refresh moves the tenant's epoch
+# up to now and rescales the stored sums, which keeps the weights near 1.
+LEGACY_DECAY_EPOCH = 1704067200.0  # 2024-01-01T00:00:00Z, before epochs were stored
+NOW_EPOCH = func.extract("epoch", UTC_NOW)
+
+SCORE_COLUMNS = {
+    "bayesian": PartnerRating.bayes_score,
+    "decayed": PartnerRating.decayed_score,
+}
+
+
+def decay_tau() -> float:
+    return settings.leaderboard_half_life_days * 86400 / math.log(2)
+
+
+def decay_weight(epoch: float, at: Optional[float] = None) -> float:
+    return math.exp(((time.time() if at is None else at) - epoch) / decay_tau())
+
+
+def decay_weight_sql(created_at, epoch: float):
+    return func.exp((func.extract("epoch", created_at) - epoch) / decay_tau())
+
+
+def decay_epoch(db) -> float:
+    # A share lock, so a refresh moving the epoch waits for concurrent writers,
+    # and writers after it see the rescaled sums.
+    epoch = db.execute(select(LeaderboardPrior.decay_epoch).with_for_update(read=True)).scalar()
+    return LEGACY_DECAY_EPOCH if epoch is None else epoch
+
+
+def score_values(rating_sum, rating_count, decay_sum, decay_count, now_weight: float) -> dict:
+    # The tenant prior acts as `weight` extra reviews of `mean` stars; for the
+    # decayed score they count as if written now.
+    prior_mass = select(func.coalesce(func.sum(LeaderboardPrior.weight * LeaderboardPrior.mean), 0.0)).scalar_subquery()
+    prior_weight = select(func.coalesce(func.sum(LeaderboardPrior.weight), 0.0)).scalar_subquery()
+    return {
+        "bayes_score": func.coalesce(
+            (prior_mass + rating_sum) / func.nullif(prior_weight + rating_count, 0), 0.0
+        ),
+        "decayed_score": func.coalesce(
+            (prior_mass * now_weight + decay_sum) / func.nullif(prior_weight * now_weight + decay_count, 0), 0.0
+        ),
+    }
+
+
+def _prior_mean(rating_sum, rating_count):
+    return func.coalesce(rating_sum.cast(LeaderboardPrior.mean.type) / func.nullif(rating_count, 0), 0.0)
+
+
+def seed_prior(db, rating_sum: int, rating_count: int) -> None:
+    # A tenant's first write sets the prior from its totals so far, this write
+    # included. After that the prior only moves on refresh, so all partners are
+    # scored against the same one. Existing priors are neither locked nor scanned.
+    totals = select(
+        literal(1),
+        _prior_mean(
+            func.coalesce(func.sum(PartnerRating.rating_sum), 0) + rating_sum,
+            func.coalesce(func.sum(PartnerRating.rating_count), 0) + rating_count,
+        ),
+        literal(settings.leaderboard_prior_weight),
+        NOW_EPOCH,
+    ).where(~exists(select(LeaderboardPrior.id)))
+    db.execute(
+        insert(LeaderboardPrior)
+        .from_select(["id", "mean", "weight", "decay_epoch"], totals)
+        .on_conflict_do_nothing(index_elements=[LeaderboardPrior.id])
+    )
+
+
+def refresh_leaderboard(db, sums_epoch: Optional[float] = None) -> int:
+    # sums_epoch is the epoch the stored decay sums are relative to, if not the
+    # prior's own.
+    if sums_epoch is None:
+        sums_epoch = db.execute(select(LeaderboardPrior.decay_epoch).with_for_update()).scalar()
+        if sums_epoch is None:
+            sums_epoch = LEGACY_DECAY_EPOCH
+    now = float(db.execute(select(NOW_EPOCH)).scalar_one())
+    # At most 1, so it can only underflow, for sums that have fully decayed.
+    scale = math.exp(min(0.0, sums_epoch - now) / decay_tau())
+
+    totals = select(
+        literal(1),
+        _prior_mean(func.sum(PartnerRating.rating_sum), func.sum(PartnerRating.rating_count)),
+        literal(settings.leaderboard_prior_weight),
+        literal(now),
+        UTC_NOW,
+    )
+    columns = ["mean", "weight", "decay_epoch", "refreshed_at"]
+    stmt = insert(LeaderboardPrior).from_select(["id", *columns], totals)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[LeaderboardPrior.id],
+        set_={c: getattr(stmt.excluded, c) for c in columns},
+    ))
+
+    # Lock rows in partner order, like apply_ratings, so the two can't deadlock.
+    locked = (
+        select(PartnerRating.partner_id)
+        .order_by(PartnerRating.partner_id)
+        .with_for_update()
+        .subquery()
+    )
+    decay_sum = PartnerRating.decay_sum * scale
+    decay_count = PartnerRating.decay_count * scale
+    result = db.execute(
+        PartnerRating.__table__.update()
+        .where(PartnerRating.partner_id == locked.c.partner_id)
+        .values(
+            decay_sum=decay_sum,
+            decay_count=decay_count,
+            **score_values(PartnerRating.rating_sum, PartnerRating.rating_count, decay_sum, decay_count, 1.0),
+        )
+    )
+    return result.rowcount
@@ -1,17 +1,83 @@
-from fastapi import FastAPI, Depends, HTTPException, Header, Query, status, APIRouter
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request, Response, status, APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
-from typing import Optional, List
+from sqlalchemy import Double, Integer, any_, bindparam, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+from datetime import date, datetime
+import logging
+import math
+import uuid
+from typing import Dict, Literal, Optional, List
 
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from app.database import get_db_session, engine
-from app.models import Base, Review
-from app.schemas import ReviewCreate, ReviewOut, PartnerRatingOut
-from app.grpc.orders_client import get_order_by_id
+from app.config import settings
+from app.database import get_db_session, get_async_db_session, engine, async_engine
+from app.migrations import SchemaVersionError, all_schemas, verify_schema_version
+from app.http_cache import cache_headers, not_modified, partner_version
+from app.leaderboard import SCORE_COLUMNS
+from app.models import SEARCH_CONFIG, PartnerRating, PartnerRatingBucket, Review
+from app.export import MEDIA_TYPES, csv_chunks, gzip_chunks, iter_review_batches, ndjson_chunks
+from app.orders import OrderInfo, lookup_order, lookup_order_async
+from app.pagination import decode_cursor, decode_score_cursor, encode_cursor, encode_score_cursor, parse_fields
+from app.replica import read_your_writes_cookie, replica_router, wrote_recently
+from app.report import aggregate_schemas, report_chunks, report_lines
+from app.trends import bucket_count, bucket_start, shift_bucket
+from app.ratings import STAR_COLUMNS, apply_ratings, get_cached_ratings, get_ratings, rating_cache
+from app.reviews import REVIEW_OUT_COLUMNS, insert_reviews
+from app.admission import AdmissionMiddleware, admission
+from app.timing import TimedRoute, TimingMiddleware, phase
+from app.tenants import TENANT_NAME_RE, tenant_registry
+from app.serialization import (
+    LEADERBOARD,
+    PARTNER_RATING,
+    PROJECTED_ROWS,
+    RATINGS_BY_PARTNER,
+    RATING_TREND,
+    REVIEW_ROWS,
+    SEARCH_ROWS,
+    json_response,
+    row_dicts,
+)
+from app.schemas import (
+    LeaderboardEntryOut,
+    ReviewAcceptedOut,
+    ReviewBatchCreate,
+    ReviewBatchItemOut,
+    ReviewBatchOut,
+    ReviewCreate,
+    ReviewLookupItemOut,
+    ReviewLookupOut,
+    ReviewLookupRequest,
+    ReviewOut,
+    ReviewSearchHitOut,
+    PartnerRatingOut,
+    RatingTrendPointOut,
+)
+from app.write_behind import QueueFull, review_writer
+from app.grpc.resilience import CircuitOpen
+from app.grpc.orders_client import (
+    get_order_by_id,
+    get_order_by_id_async,
+    get_orders_by_ids,
+    close_channels,
+    aclose_channels,
+)
+
+logger = logging.getLogger(__name__)
+
+TREND_DEFAULT_BUCKETS = 30
+TREND_MAX_BUCKETS = 1000
 
 app = FastAPI(title="Review Microservice")
+app.router.route_class = TimedRoute
+
+app.add_middleware(AdmissionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,23 +87,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(TimingMiddleware)
+
 router = APIRouter()
 Instrumentator().instrument(app).expose(app)
 app.include_router(router)
 
 def get_tenant_id(x_tenant_id: Optional[str] = Header(None)) -> str:
-    return x_tenant_id or "public"
+    tenant_id = (x_tenant_id or "public").lower()
+    if not TENANT_NAME_RE.match(tenant_id):
+        raise HTTPException(status_code=400, detail="Invalid tenant id")
+    if not tenant_registry.exists(tenant_id):
+        raise HTTPException(status_code=404, detail="Unknown tenant")
+    return tenant_id
 
 def get_db_with_schema(tenant_id: str = Depends(get_tenant_id)):
     with get_db_session(schema=tenant_id) as db:
         yield db
 
+def get_read_db_with_schema(request: Request, tenant_id: str = Depends(get_tenant_id)):
+    with replica_router.read_session(tenant_id, sticky=wrote_recently(request.cookies)) as db:
+        yield db
+
+def _mark_write(response: Response) -> None:
+    # Sends this client's reads to the primary for a while, so it sees its own review.
+    if replica_router.replica is not None and settings.read_your_writes_seconds > 0:
+        response.set_cookie(**read_your_writes_cookie())
+
+async def get_async_db_with_schema(tenant_id: str = Depends(get_tenant_id)):
+    async with get_async_db_session(schema=tenant_id) as db:
+        yield db
+
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    if settings.schema_version_check != "off":
+        try:
+            verify_schema_version(engine)
+        except SchemaVersionError:
+            if settings.schema_version_check == "error":
+                raise
+            logger.warning("Schema version check failed", exc_info=True)
+    if admission.enabled:
+        # Admission control only reads the tenant list already loaded.
+        tenant_registry.schemas()
+    if settings.write_behind_enabled:
+        review_writer.start()
 
-@app.get("/health", tags=["health"])
-def health(db: Session = Depends(get_db_with_schema)):
+@app.on_event("shutdown")
+async def on_shutdown():
+    if review_writer.running:
+        await run_in_threadpool(review_writer.stop, settings.write_behind_drain_timeout_seconds)
+    close_channels()
+    await aclose_channels()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+def health(db: Session = Depends(get_read_db_with_schema)):
     try:
         db.execute(select(1))
     except Exception as e:
@@ -47,100 +152,544 @@ def health(db: Session = Depends(get_db_with_schema)):
         )
     return {"status": "ok", "db": "ok"}
 
+async def health_async(db: AsyncSession = Depends(get_async_db_with_schema)):
+    try:
+        await db.execute(select(1))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database unavailable: {e}",
+        )
+    return {"status": "ok", "db": "ok"}
+
 @app.get("/")
 def root():
     return {"message": "Review Service is running"}
 
 
 
-@app.post("/reviews", response_model=ReviewOut, status_code=201)
+def _orders_circuit_open(e: CircuitOpen) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Order service unavailable: circuit open",
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
+def _order_partner_id(order: Optional[OrderInfo]) -> str:
+    if order is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    if not order.partner_id:
+        raise HTTPException(status_code=400, detail="Order has no partner_id set")
+
+    return order.partner_id
+
+def _existing_review(db: Session, payload: ReviewCreate, idempotency_key: Optional[str]) -> Optional[Review]:
+    if idempotency_key:
+        existing = db.execute(
+            select(Review).where(Review.idempotency_key == idempotency_key)
+        ).scalar_one_or_none()
+        if existing is not None:
+            if existing.order_id != payload.order_id or existing.user_id != payload.user_id:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was used for a different review")
+            return existing
+
+    if db.execute(select(Review.id).where(Review.order_id == payload.order_id)).first():
+        raise HTTPException(status_code=409, detail="Order already reviewed")
+    return None
+
+def _insert_review(
+    db: Session,
+    payload: ReviewCreate,
+    partner_id: str,
+    idempotency_key: Optional[str] = None,
+):
+    stmt = (
+        insert(Review)
+        .values(
+            id=Review.new_id(),
+            order_id=payload.order_id,
+            user_id=payload.user_id,
+            partner_id=partner_id,
+            rating=payload.rating,
+            comment=payload.comment,
+            idempotency_key=idempotency_key,
+        )
+        .returning(*REVIEW_OUT_COLUMNS)
+    )
+
+    try:
+        with phase("insert_commit"):
+            review = db.execute(stmt).one()
+            apply_ratings(db, [(partner_id, payload.rating)])
+            db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent request for the same order or key.
+        db.rollback()
+        existing = _existing_review(db, payload, idempotency_key)
+        if existing is None:
+            raise
+        return existing, False
+
+    return review, True
+
+def _queue_review(
+    tenant_id: str,
+    payload: ReviewCreate,
+    partner_id: str,
+    idempotency_key: Optional[str],
+) -> JSONResponse:
+    row = {
+        "id": Review.new_id(),
+        "order_id": payload.order_id,
+        "user_id": payload.user_id,
+        "partner_id": partner_id,
+        "rating": payload.rating,
+        "comment": payload.comment,
+        "idempotency_key": idempotency_key,
+    }
+    try:
+        queued = review_writer.submit(tenant_id, row)
+    except QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Review queue is full",
+            headers={"Retry-After": str(settings.write_behind_retry_after_seconds)},
+        )
+    if queued is not row:
+        _check_pending_replay(queued, payload, idempotency_key)
+    accepted = _accepted(queued)
+    _mark_write(accepted)
+    return accepted
+
+def _check_pending_replay(queued: dict, payload: ReviewCreate, idempotency_key: Optional[str]) -> None:
+    if not idempotency_key or queued["idempotency_key"] != idempotency_key:
+        raise HTTPException(status_code=409, detail="Order already reviewed")
+    if queued["order_id"] != payload.order_id or queued["user_id"] != payload.user_id:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was used for a different review")
+
+def _accepted(queued: dict) -> JSONResponse:
+    body = ReviewAcceptedOut(id=queued["id"], order_id=queued["order_id"])
+    return JSONResponse(jsonable_encoder(body), status_code=status.HTTP_202_ACCEPTED)
+
+def _pending_review(tenant_id: str, payload: ReviewCreate, idempotency_key: Optional[str]) -> Optional[JSONResponse]:
+    if not review_writer.running:
+        return None
+    queued = review_writer.pending(tenant_id, payload.order_id, idempotency_key)
+    if queued is None:
+        return None
+    _check_pending_replay(queued, payload, idempotency_key)
+    return _accepted(queued)
+
 def create_review(
     payload: ReviewCreate,
+    response: Response,
     tenant_id: str = Depends(get_tenant_id),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db_with_schema),
 ):
+    _mark_write(response)
+    existing = _existing_review(db, payload, idempotency_key)
+    if existing is not None:
+        response.status_code = status.HTTP_200_OK
+        return existing
+    queued = _pending_review(tenant_id, payload, idempotency_key)
+    if queued is not None:
+        return queued
+
     try:
-        resp = get_order_by_id(order_id=payload.order_id, tenant_id=tenant_id)
+        order = lookup_order(get_order_by_id, payload.order_id, tenant_id)
+    except CircuitOpen as e:
+        raise _orders_circuit_open(e)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Order service unavailable: {e}")
 
-    if not resp or not resp.HasField("order"):
-        raise HTTPException(status_code=404, detail="Order not found")
+    partner_id = _order_partner_id(order)
+    if review_writer.running:
+        return _queue_review(tenant_id, payload, partner_id, idempotency_key)
+    review, created = _insert_review(db, payload, partner_id, idempotency_key)
+    if created:
+        rating_cache.invalidate((tenant_id, partner_id))
+    else:
+        response.status_code = status.HTTP_200_OK
+    return review
 
-    order = resp.order
+async def create_review_async(
+    payload: ReviewCreate,
+    response: Response,
+    tenant_id: str = Depends(get_tenant_id),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db_with_schema),
+):
+    _mark_write(response)
+    existing = await db.run_sync(_existing_review, payload, idempotency_key)
+    if existing is not None:
+        response.status_code = status.HTTP_200_OK
+        return existing
+    queued = _pending_review(tenant_id, payload, idempotency_key)
+    if queued is not None:
+        return queued
 
-    if not order.HasField("partner_id") or not order.partner_id:
-        raise HTTPException(status_code=400, detail="Order has no partner_id set")
+    try:
+        order = await lookup_order_async(get_order_by_id_async, payload.order_id, tenant_id)
+    except CircuitOpen as e:
+        raise _orders_circuit_open(e)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Order service unavailable: {e}")
+
+    partner_id = _order_partner_id(order)
+    if review_writer.running:
+        return _queue_review(tenant_id, payload, partner_id, idempotency_key)
+    review, created = await db.run_sync(_insert_review, payload, partner_id, idempotency_key)
+    if created:
+        rating_cache.invalidate((tenant_id, partner_id))
+    else:
+        response.status_code = status.HTTP_200_OK
+    return review
 
-    # existing = db.execute(
-    #     select(Review).where(Review.order_id == payload.order_id)
-    # ).scalar_one_or_none()
-    # if existing:
-    #     raise HTTPException(status_code=409, detail="Order already reviewed")
-
-    review = Review(
-        id=Review.new_id(),
-        order_id=payload.order_id,
-        user_id=payload.user_id,
-        partner_id=order.partner_id,
-        rating=payload.rating,
-        comment=payload.comment,
+if settings.db_mode == "async":
+    app.get("/health", tags=["health"])(health_async)
+    app.post("/reviews", response_model=ReviewOut, status_code=201)(create_review_async)
+else:
+    app.get("/health", tags=["health"])(health)
+    app.post("/reviews", response_model=ReviewOut, status_code=201)(create_review)
+
+@app.post("/reviews:batch", response_model=ReviewBatchOut)
+def create_reviews_batch(
+    payload: ReviewBatchCreate,
+    response: Response,
+    tenant_id: str = Depends(get_tenant_id),
+    db: Session = Depends(get_db_with_schema),
+):
+    _mark_write(response)
+    if len(payload.reviews) > settings.review_batch_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: at most {settings.review_batch_max} reviews",
+        )
+
+    unique: dict[int, ReviewCreate] = {}
+    for review in payload.reviews:
+        unique.setdefault(review.order_id, review)
+
+    try:
+        with phase("orders_grpc"):
+            orders = get_orders_by_ids(order_ids=list(unique), tenant_id=tenant_id)
+    except CircuitOpen as e:
+        raise _orders_circuit_open(e)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Order service unavailable: {e}")
+
+    statuses: dict[int, str] = {}
+    rows = []
+    for order_id, review in unique.items():
+        order = orders.get(order_id)
+        if order is None:
+            statuses[order_id] = "order_not_found"
+        elif not order.HasField("partner_id") or not order.partner_id:
+            statuses[order_id] = "missing_partner"
+        else:
+            rows.append({
+                "id": Review.new_id(),
+                "order_id": order_id,
+                "user_id": review.user_id,
+                "partner_id": order.partner_id,
+                "rating": review.rating,
+                "comment": review.comment,
+            })
+
+    with phase("insert_commit"):
+        inserted = {row.order_id: row for row in insert_reviews(db, rows)}
+        db.commit()
+
+    for partner_id in {row.partner_id for row in inserted.values()}:
+        rating_cache.invalidate((tenant_id, partner_id))
+
+    items = []
+    for review in payload.reviews:
+        created = inserted.pop(review.order_id, None)
+        if created is not None:
+            items.append(ReviewBatchItemOut(order_id=review.order_id, status="created", id=created.id))
+        else:
+            items.append(ReviewBatchItemOut(order_id=review.order_id, status=statuses.get(review.order_id, "duplicate")))
+
+    return ReviewBatchOut(created=sum(item.status == "created" for item in items), items=items)
+
+# One statement for the whole batch; the covering uq_reviews_order_id index
+# answers it with an index-only scan.
+REVIEWED_ORDERS = select(Review.order_id, Review.id).where(
+    Review.order_id == any_(bindparam("order_ids", type_=ARRAY(Integer)))
+)
+
+@app.post("/reviews:lookup", response_model=ReviewLookupOut)
+def lookup_reviews(
+    payload: ReviewLookupRequest,
+    db: Session = Depends(get_read_db_with_schema),
+):
+    if len(payload.order_ids) > settings.review_lookup_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lookup too large: at most {settings.review_lookup_max} order ids",
+        )
+
+    reviewed = dict(db.execute(REVIEWED_ORDERS, {"order_ids": list(set(payload.order_ids))}).all())
+    return ReviewLookupOut(items=[
+        ReviewLookupItemOut(order_id=order_id, reviewed=order_id in reviewed, id=reviewed.get(order_id))
+        for order_id in payload.order_ids
+    ])
+
+@app.get("/users/{user_id}/reviews", response_model=List[ReviewOut])
+def list_user_reviews(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db_with_schema),
+):
+    names = list(ReviewOut.model_fields)
+    stmt = (
+        select(*(getattr(Review, name) for name in names))
+        .where(Review.user_id == user_id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+        .limit(limit + 1)
     )
+    if cursor:
+        created_at, review_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Review.created_at, Review.id) < tuple_(created_at, review_id))
 
-    db.add(review)
-    db.commit()
-    db.refresh(review)
-    return review
+    rows = db.execute(stmt).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return json_response(REVIEW_ROWS, row_dicts(names, rows), headers=headers)
+
+@app.get("/reviews/export")
+def export_reviews(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    partner_id: Optional[str] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    gzip: bool = Query(False),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    batches = iter_review_batches(
+        tenant_id,
+        settings.export_batch_size,
+        partner_id=partner_id,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    chunks = ndjson_chunks(batches) if format == "ndjson" else csv_chunks(batches)
+
+    headers = {"Content-Disposition": f'attachment; filename="reviews-{tenant_id}.{format}"'}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format], headers=headers)
+
+@app.get("/reviews/search", response_model=List[ReviewSearchHitOut])
+def search_reviews(
+    q: str = Query(..., min_length=1, max_length=200),
+    partner_id: Optional[str] = Query(None),
+    min_rating: int = Query(1, ge=1, le=5),
+    max_rating: int = Query(5, ge=1, le=5),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db_with_schema),
+):
+    # websearch syntax ("quoted phrases", or, -negation) never raises on user input.
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # ts_rank is real; as double it round-trips through the cursor exactly.
+    rank = func.ts_rank(Review.comment_tsv, query).cast(Double)
+    names = list(ReviewOut.model_fields)
+    stmt = (
+        select(*(getattr(Review, name) for name in names), rank.label("rank"))
+        .where(Review.comment_tsv.bool_op("@@")(query))
+        .order_by(rank.desc(), Review.id.desc())
+        .limit(limit + 1)
+    )
+    if partner_id is not None:
+        stmt = stmt.where(Review.partner_id == partner_id)
+    if min_rating > 1:
+        stmt = stmt.where(Review.rating >= min_rating)
+    if max_rating < 5:
+        stmt = stmt.where(Review.rating <= max_rating)
+    if created_from is not None:
+        stmt = stmt.where(Review.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Review.created_at < created_to)
+    if cursor:
+        last_rank, review_id = decode_score_cursor(cursor)
+        try:
+            review_id = str(uuid.UUID(review_id))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from e
+        stmt = stmt.where(tuple_(rank, Review.id) < tuple_(last_rank, review_id))
+
+    rows = db.execute(stmt).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_score_cursor(rows[-1].rank, rows[-1].id)
+
+    return json_response(SEARCH_ROWS, row_dicts([*names, "rank"], rows), headers=headers)
+
+@app.get("/reports/ratings")
+def ratings_report(
+    tenants: Optional[str] = Query(None),
+    concurrency: Optional[int] = Query(None, ge=1, le=64),
+):
+    schemas = all_schemas(engine)
+    if tenants is not None:
+        requested = list(dict.fromkeys(t.strip() for t in tenants.split(",") if t.strip()))
+        unknown = sorted(set(requested) - set(schemas))
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Unknown tenants: {', '.join(unknown)}")
+        schemas = requested
+
+    # Read-only and cross-tenant, so it goes to the replica whenever reads may.
+    source = replica_router.replica if replica_router.replica is not None and replica_router.state() == "ok" else engine
+    results = aggregate_schemas(source, schemas, concurrency or settings.report_concurrency)
+    return StreamingResponse(report_chunks(report_lines(results)), media_type=MEDIA_TYPES["ndjson"])
 
 @app.get("/partners/{partner_id}/reviews", response_model=List[ReviewOut])
-def list_partner_reviews(partner_id: str, db: Session = Depends(get_db_with_schema)):
-    reviews = db.execute(
-        select(Review).where(Review.partner_id == partner_id).order_by(Review.created_at.desc())
-    ).scalars().all()
-    return reviews
+def list_partner_reviews(
+    partner_id: str,
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db_with_schema),
+):
+    projection = parse_fields(fields, ReviewOut.model_fields)
+    names = list(dict.fromkeys([*projection, "created_at", "id"])) if projection else list(ReviewOut.model_fields)
+
+    headers = cache_headers(*partner_version(db, partner_id))
+    unchanged = not_modified(request, headers)
+    if unchanged is not None:
+        return unchanged
+
+    stmt = (
+        select(*(getattr(Review, name) for name in names))
+        .where(Review.partner_id == partner_id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, review_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Review.created_at, Review.id) < tuple_(created_at, review_id))
+
+    rows = db.execute(stmt).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    # Projected names come first in the select, so zip drops the cursor-only columns.
+    if projection:
+        return json_response(PROJECTED_ROWS, row_dicts(projection, rows), headers=headers)
+    return json_response(REVIEW_ROWS, row_dicts(names, rows), headers=headers)
+
+@app.get("/partners/leaderboard", response_model=List[LeaderboardEntryOut])
+def get_leaderboard(
+    order: Literal["bayesian", "decayed"] = Query("bayesian"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    min_count: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db_with_schema),
+):
+    score = SCORE_COLUMNS[order]
+    stmt = (
+        select(PartnerRating.partner_id, score.label("score"), PartnerRating.rating_sum, PartnerRating.rating_count)
+        .where(PartnerRating.rating_count > 0)
+        .order_by(score.desc(), PartnerRating.partner_id.desc())
+        .limit(limit + 1)
+    )
+    if min_count:
+        stmt = stmt.where(PartnerRating.rating_count >= min_count)
+    if cursor:
+        stmt = stmt.where(tuple_(score, PartnerRating.partner_id) < tuple_(*decode_score_cursor(cursor)))
+
+    rows = db.execute(stmt).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_score_cursor(rows[-1].score, rows[-1].partner_id)
+
+    content = [
+        {
+            "partner_id": row.partner_id,
+            "score": row.score,
+            "avg_rating": row.rating_sum / row.rating_count,
+            "count": row.rating_count,
+        }
+        for row in rows
+    ]
+    return json_response(LEADERBOARD, content, headers=headers)
 
-@app.get("/partners/ratings")
+@app.get("/partners/ratings", response_model=Dict[str, PartnerRatingOut])
 def get_partners_ratings(
     partner_ids: str = Query(...),
-    db: Session = Depends(get_db_with_schema),
+    tenant_id: str = Depends(get_tenant_id),
+    db: Session = Depends(get_read_db_with_schema),
+):
+    partner_ids_list = list(dict.fromkeys(pid.strip() for pid in partner_ids.split(",") if pid.strip()))
+    return json_response(RATINGS_BY_PARTNER, get_ratings(db, tenant_id, partner_ids_list))
+
+@app.get("/partners/{partner_id}/rating", response_model=PartnerRatingOut)
+def get_partner_rating(
+    partner_id: str,
+    request: Request,
+    tenant_id: str = Depends(get_tenant_id),
+    db: Session = Depends(get_read_db_with_schema),
+):
+    rating = get_cached_ratings(db, tenant_id, [partner_id])[partner_id]
+    headers = cache_headers(rating.version, rating.updated_at)
+    unchanged = not_modified(request, headers)
+    if unchanged is not None:
+        return unchanged
+    return json_response(PARTNER_RATING, rating.body, headers=headers)
+
+@app.get("/partners/{partner_id}/rating/trend", response_model=List[RatingTrendPointOut])
+def get_partner_rating_trend(
+    partner_id: str,
+    granularity: Literal["day", "week", "month"] = Query("day"),
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_read_db_with_schema),
 ):
-    partner_ids_list = [pid.strip() for pid in partner_ids.split(",") if pid.strip()]
+    last = bucket_start(end or datetime.utcnow().date(), granularity)
+    first = bucket_start(start, granularity) if start else shift_bucket(last, granularity, -(TREND_DEFAULT_BUCKETS - 1))
+    if first > last:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if bucket_count(first, last, granularity) > TREND_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"At most {TREND_MAX_BUCKETS} buckets per request")
 
+    columns = ["bucket_start", "rating_sum", "rating_count", *STAR_COLUMNS.values()]
     rows = db.execute(
-        select(
-            Review.partner_id,
-            func.avg(Review.rating),
-            func.count(Review.id),
+        select(*(getattr(PartnerRatingBucket, column) for column in columns))
+        .where(
+            PartnerRatingBucket.partner_id == partner_id,
+            PartnerRatingBucket.granularity == granularity,
+            PartnerRatingBucket.bucket_start.between(first, last),
         )
-        .where(Review.partner_id.in_(partner_ids_list))
-        .group_by(Review.partner_id)
+        .order_by(PartnerRatingBucket.bucket_start)
     ).all()
+    found = {row[0]: row[1:] for row in rows}
 
-    result = {
-        partner_id: PartnerRatingOut(
-            partner_id=partner_id,
-            avg_rating=float(avg) if avg is not None else 0.0,
-            count=int(count),
-        )
-        for partner_id, avg, count in rows
-    }
-
-    for pid in partner_ids_list:
-        if pid not in result:
-            result[pid] = PartnerRatingOut(
-                partner_id=pid,
-                avg_rating=0.0,
-                count=0,
-            )
-
-    return result
-
-@app.get("/partners/{partner_id}/rating", response_model=PartnerRatingOut)
-def get_partner_rating(partner_id: str, db: Session = Depends(get_db_with_schema)):
-    row = db.execute(
-        select(func.avg(Review.rating), func.count(Review.id)).where(Review.partner_id == partner_id)
-    ).one()
-    avg_rating = float(row[0]) if row[0] is not None else 0.0
-    count = int(row[1]) if row[1] is not None else 0
-
-    return PartnerRatingOut(partner_id=partner_id, avg_rating=avg_rating, count=count)
+    # Buckets without reviews are filled in, so the series has no gaps. Counting
+    # from `first` never steps past `last`, which may be the last bucket of date.max.
+    series = []
+    for i in range(bucket_count(first, last, granularity)):
+        current = shift_bucket(first, granularity, i)
+        rating_sum, count, *stars = found.get(current, (0, 0, 0, 0, 0, 0, 0))
+        series.append({
+            "bucket_start": current,
+            "avg_rating": rating_sum / count if count else 0.0,
+            "count": count,
+            "distribution": dict(zip(STAR_COLUMNS, stars)),
+        })
+    return json_response(RATING_TREND, series)
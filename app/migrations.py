@@ -0,0 +1,299 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, NamedTuple, Optional, Union
+
+from sqlalchemy import Connection, Engine, text
+
+from app.database import set_search_path
+from app.leaderboard import LEGACY_DECAY_EPOCH, refresh_leaderboard
+from app.models import SEARCH_CONFIG, Base
+from app.ratings import rebuild_ratings
+from app.trends import rebuild_rollups
+from app.tenants import TENANT_NAME_RE, tenant_registry
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "review_schema_migrations"
+
+Step = Union[str, Callable[[Connection], None]]
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    steps: tuple[Step, ...]
+    # Run outside a transaction, e.g. for CREATE INDEX CONCURRENTLY.
+    concurrently: bool = False
+
+
+def _create_tables(conn: Connection) -> None:
+    Base.metadata.create_all(bind=conn)
+
+
+def create_index_concurrently(name: str, ddl: str) -> Callable[[Connection], None]:
+    def step(conn: Connection) -> None:
+        valid = conn.execute(
+            text(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace"
+            ),
+            {"name": name},
+        ).scalar_one_or_none()
+        if valid is False:
+            # Left behind by an interrupted CONCURRENTLY build.
+            conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        conn.exec_driver_sql(ddl)
+
+    return step
+
+
+def _cover_order_id(conn: Connection) -> None:
+    covering = conn.execute(text(
+        "SELECT i.indnatts > i.indnkeyatts FROM pg_constraint c JOIN pg_index i ON i.indexrelid = c.conindid "
+        "WHERE c.conname = 'uq_reviews_order_id' AND c.connamespace = current_schema()::regnamespace"
+    )).scalar_one_or_none()
+    if covering:
+        return
+    create_index_concurrently(
+        "ix_reviews_order_id_covering",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_order_id_covering ON reviews (order_id) INCLUDE (id)",
+    )(conn)
+    # Only a catalog change: the constraint takes over (and renames) the new index.
+    conn.exec_driver_sql(
+        "ALTER TABLE reviews DROP CONSTRAINT IF EXISTS uq_reviews_order_id, "
+        "ADD CONSTRAINT uq_reviews_order_id UNIQUE USING INDEX ix_reviews_order_id_covering"
+    )
+
+
+# Steps must be idempotent: version 1 creates missing tables in their current
+# shape, so later migrations may find their change already in place.
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline_tables", (_create_tables,)),
+    Migration(2, "idempotency_key", (
+        "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS idempotency_key varchar(255)",
+        """
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conname = 'uq_reviews_idempotency_key' AND connamespace = current_schema()::regnamespace
+            ) THEN
+                ALTER TABLE reviews ADD CONSTRAINT uq_reviews_idempotency_key UNIQUE (idempotency_key);
+            END IF;
+        END $$
+        """,
+    )),
+    Migration(3, "partner_keyset_index", (
+        create_index_concurrently(
+            "ix_reviews_partner_created_id",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_partner_created_id "
+            "ON reviews (partner_id, created_at DESC, id DESC)",
+        ),
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_reviews_partner_id",
+    ), concurrently=True),
+    Migration(4, "native_uuid_ids_and_server_timestamps", (
+        """
+        DO $$ BEGIN
+            IF (
+                SELECT data_type FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = 'reviews' AND column_name = 'id'
+            ) <> 'uuid' THEN
+                ALTER TABLE reviews ALTER COLUMN id TYPE uuid USING id::uuid;
+            END IF;
+        END $$
+        """,
+        "DROP INDEX IF EXISTS ix_reviews_id",
+        "DROP INDEX IF EXISTS ix_reviews_order_id",
+        "UPDATE reviews SET created_at = timezone('utc', now()) WHERE created_at IS NULL",
+        "UPDATE reviews SET updated_at = created_at WHERE updated_at IS NULL",
+        "ALTER TABLE reviews ALTER COLUMN created_at SET DEFAULT timezone('utc', now())",
+        "ALTER TABLE reviews ALTER COLUMN created_at SET NOT NULL",
+        "ALTER TABLE reviews ALTER COLUMN updated_at SET DEFAULT timezone('utc', now())",
+        "ALTER TABLE reviews ALTER COLUMN updated_at SET NOT NULL",
+        "ALTER TABLE partner_ratings ALTER COLUMN updated_at SET DEFAULT timezone('utc', now())",
+    )),
+    Migration(5, "leaderboard_scores", (
+        "ALTER TABLE partner_ratings ADD COLUMN IF NOT EXISTS decay_sum double precision NOT NULL DEFAULT 0",
+        "ALTER TABLE partner_ratings ADD COLUMN IF NOT EXISTS decay_count double precision NOT NULL DEFAULT 0",
+        "ALTER TABLE partner_ratings ADD COLUMN IF NOT EXISTS bayes_score double precision NOT NULL DEFAULT 0",
+        "ALTER TABLE partner_ratings ADD COLUMN IF NOT EXISTS decayed_score double precision NOT NULL DEFAULT 0",
+        _create_tables,
+        # Backfills the decay sums from review timestamps and computes scores.
+        rebuild_ratings,
+    )),
+    Migration(6, "leaderboard_indexes", (
+        create_index_concurrently(
+            "ix_partner_ratings_bayes_score",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_partner_ratings_bayes_score "
+            "ON partner_ratings (bayes_score DESC, partner_id DESC)",
+        ),
+        create_index_concurrently(
+            "ix_partner_ratings_decayed_score",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_partner_ratings_decayed_score "
+            "ON partner_ratings (decayed_score DESC, partner_id DESC)",
+        ),
+    ), concurrently=True),
+    Migration(7, "partner_versions", (
+        "CREATE SEQUENCE IF NOT EXISTS partner_ratings_version_seq",
+        # The volatile default gives every existing row its own version.
+        "ALTER TABLE partner_ratings ADD COLUMN IF NOT EXISTS version bigint NOT NULL "
+        "DEFAULT nextval('partner_ratings_version_seq')",
+    )),
+    # Rewrites reviews under an exclusive lock; the index is built separately
+    # without blocking writes.
+    Migration(8, "comment_search_vector", (
+        f"ALTER TABLE reviews ADD COLUMN IF NOT EXISTS comment_tsv tsvector GENERATED ALWAYS AS "
+        f"(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(comment, ''))) STORED",
+    )),
+    Migration(9, "comment_search_index", (
+        create_index_concurrently(
+            "ix_reviews_comment_tsv",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_comment_tsv ON reviews USING gin (comment_tsv)",
+        ),
+    ), concurrently=True),
+    Migration(10, "rating_rollups", (
+        _create_tables,
+        # Backfills the buckets from review timestamps.
+        rebuild_rollups,
+    )),
+    Migration(11, "covering_order_id_index", (_cover_order_id,), concurrently=True),
+    Migration(12, "leaderboard_decay_epoch", (
+        f"ALTER TABLE leaderboard_prior ADD COLUMN IF NOT EXISTS decay_epoch double precision NOT NULL "
+        f"DEFAULT {LEGACY_DECAY_EPOCH}",
+        "ALTER TABLE leaderboard_prior ALTER COLUMN decay_epoch DROP DEFAULT",
+        # Rebases the stored decay sums to now.
+        refresh_leaderboard,
+    )),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def _run_step(conn: Connection, step: Step) -> None:
+    if callable(step):
+        step(conn)
+    else:
+        conn.exec_driver_sql(step)
+
+
+def _applied_versions(conn: Connection) -> set[int]:
+    conn.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+        "version integer PRIMARY KEY, name text NOT NULL, "
+        "applied_at timestamp NOT NULL DEFAULT timezone('utc', now()))"
+    )
+    versions = set(conn.execute(text(f"SELECT version FROM {VERSION_TABLE}")).scalars())
+    conn.commit()
+    return versions
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text(f"INSERT INTO {VERSION_TABLE} (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name},
+    )
+
+
+def migrate_schema(engine: Engine, schema: str) -> list[int]:
+    applied = []
+    with engine.connect() as conn:
+        set_search_path(conn, schema)
+        # Serializes runners (e.g. two pods) working on the same schema.
+        conn.execute(text("SELECT pg_advisory_lock(hashtext(:key))"), {"key": f"review-migrations:{schema}"})
+        conn.commit()
+        try:
+            done = _applied_versions(conn)
+            for migration in MIGRATIONS:
+                if migration.version in done:
+                    continue
+                logger.info("Applying migration %s_%s to %s", migration.version, migration.name, schema)
+                if migration.concurrently:
+                    conn.execution_options(isolation_level="AUTOCOMMIT")
+                    try:
+                        for step in migration.steps:
+                            _run_step(conn, step)
+                    finally:
+                        conn.rollback()
+                        conn.execution_options(isolation_level=conn.default_isolation_level)
+                    _record(conn, migration)
+                    conn.commit()
+                else:
+                    for step in migration.steps:
+                        _run_step(conn, step)
+                    _record(conn, migration)
+                    conn.commit()
+                applied.append(migration.version)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext(:key))"), {"key": f"review-migrations:{schema}"})
+            conn.commit()
+    return applied
+
+
+def tenant_schemas(engine: Engine) -> list[str]:
+    with engine.connect() as conn:
+        return sorted(conn.execute(text(
+            "SELECT DISTINCT table_schema FROM information_schema.tables "
+            "WHERE table_name IN ('reviews', :version_table)"
+        ), {"version_table": VERSION_TABLE}).scalars())
+
+
+def all_schemas(engine: Engine) -> list[str]:
+    return sorted(set(tenant_schemas(engine)) | {"public"})
+
+
+def migrate_all(
+    engine: Engine,
+    schemas: Iterable[str],
+    concurrency: int,
+    progress: Optional[Callable[[str, Optional[list[int]], Optional[BaseException]], None]] = None,
+) -> dict[str, Union[list[int], BaseException]]:
+    results: dict[str, Union[list[int], BaseException]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(migrate_schema, engine, schema): schema for schema in schemas}
+        for future in as_completed(futures):
+            schema = futures[future]
+            try:
+                results[schema] = future.result()
+                error = None
+            except Exception as e:
+                logger.exception("Migration of %s failed", schema)
+                results[schema] = error = e
+            if progress is not None:
+                progress(schema, None if error else results[schema], error)
+    return results
+
+
+def provision_tenant(engine: Engine, schema: str) -> list[int]:
+    if not TENANT_NAME_RE.match(schema):
+        raise ValueError(f"Invalid tenant schema name: {schema!r}")
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"CREATE SCHEMA IF NOT EXISTS {conn.dialect.identifier_preparer.quote_identifier(schema)}")
+        conn.commit()
+    applied = migrate_schema(engine, schema)
+    tenant_registry.invalidate()
+    return applied
+
+
+def schema_version(engine: Engine, schema: str) -> int:
+    with engine.connect() as conn:
+        set_search_path(conn, schema)
+        exists = conn.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": VERSION_TABLE}).scalar_one()
+        if not exists:
+            return 0
+        return conn.execute(text(f"SELECT coalesce(max(version), 0) FROM {VERSION_TABLE}")).scalar_one()
+
+
+def verify_schema_version(engine: Engine, schema: str = "public") -> int:
+    version = schema_version(engine, schema)
+    if version < LATEST_VERSION:
+        raise SchemaVersionError(
+            f"Schema {schema!r} is at migration {version}, expected {LATEST_VERSION}; "
+            "run 'python -m app.cli migrate'"
+        )
+    return version
@@ -1,7 +1,38 @@
-from datetime import datetime
+from datetime import date, datetime
+import secrets
+import threading
+import time
 import uuid
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, DateTime, Integer, Text, UniqueConstraint
+from sqlalchemy import (
+    BigInteger, Computed, Date, DateTime, Double, Index, Integer, Sequence, SmallInteger, String, Text,
+    UniqueConstraint, Uuid, func,
+)
+
+UTC_NOW = func.timezone("utc", func.now())
+
+# No stemming or stop words: comments are written in more than one language.
+SEARCH_CONFIG = "simple"
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_seq = 0
+
+def uuid7() -> uuid.UUID:
+    # RFC 9562 UUIDv7: 48-bit unix ms timestamp, 12-bit sequence (monotonic
+    # within a millisecond in this process), 62 random bits.
+    global _uuid7_last_ms, _uuid7_seq
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            _uuid7_last_ms, _uuid7_seq = ms, secrets.randbits(11)
+        else:
+            _uuid7_seq += 1
+            if _uuid7_seq > 0xFFF:
+                _uuid7_last_ms, _uuid7_seq = _uuid7_last_ms + 1, 0
+        ms, seq = _uuid7_last_ms, _uuid7_seq
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (seq << 64) | (0b10 << 62) | secrets.randbits(62))
 
 class Base(DeclarativeBase):
     pass
@@ -9,21 +40,97 @@ class Base(DeclarativeBase):
 class Review(Base):
     __tablename__ = "reviews"
     __table_args__ = (
-        UniqueConstraint("order_id", name="uq_reviews_order_id"),
+        # Covers id, so "which of these orders are reviewed" is an index-only scan.
+        UniqueConstraint("order_id", name="uq_reviews_order_id", postgresql_include=["id"]),
+        UniqueConstraint("idempotency_key", name="uq_reviews_idempotency_key"),
     )
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, index=True, unique=True)
-    order_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
+    order_id: Mapped[int] = mapped_column(Integer, nullable=False)
 
     user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
-    partner_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    partner_id: Mapped[str] = mapped_column(String(36), nullable=False)
 
     rating: Mapped[int] = mapped_column(Integer, nullable=False)
     comment: Mapped[str | None] = mapped_column(Text, nullable=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=UTC_NOW)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=UTC_NOW, onupdate=UTC_NOW)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    comment_tsv: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(comment, ''))", persisted=True),
+        deferred=True,
+    )
 
     @staticmethod
     def new_id() -> str:
-        return str(uuid.uuid4())
+        return str(uuid7())
+
+# Serves keyset pagination of a partner's reviews, newest first.
+Index("ix_reviews_partner_created_id", Review.partner_id, Review.created_at.desc(), Review.id.desc())
+Index("ix_reviews_comment_tsv", Review.comment_tsv, postgresql_using="gin")
+
+STARS = range(1, 6)
+# Per-star count columns of partner_ratings and partner_rating_buckets.
+STAR_COLUMNS = {star: f"star_{star}" for star in STARS}
+
+# Schema-wide counter, so a partner's version never repeats, even after rebuild-ratings.
+PARTNER_VERSION_SEQ = Sequence("partner_ratings_version_seq", metadata=Base.metadata)
+
+class PartnerRating(Base):
+    __tablename__ = "partner_ratings"
+
+    partner_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+
+    rating_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rating_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    star_1: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    star_2: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    star_3: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    star_4: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    star_5: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=UTC_NOW, onupdate=UTC_NOW)
+    # Bumped on every change to the partner's reviews; served as the ETag.
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=PARTNER_VERSION_SEQ.next_value())
+
+    # Leaderboard inputs and precomputed scores; see app.leaderboard.
+    decay_sum: Mapped[float] = mapped_column(Double, nullable=False, default=0, server_default="0")
+    decay_count: Mapped[float] = mapped_column(Double, nullable=False, default=0, server_default="0")
+    bayes_score: Mapped[float] = mapped_column(Double, nullable=False, default=0, server_default="0")
+    decayed_score: Mapped[float] = mapped_column(Double, nullable=False, default=0, server_default="0")
+
+# Serve the leaderboard's keyset pagination, best first.
+Index("ix_partner_ratings_bayes_score", PartnerRating.bayes_score.desc(), PartnerRating.partner_id.desc())
+Index("ix_partner_ratings_decayed_score", PartnerRating.decayed_score.desc(), PartnerRating.partner_id.desc())
+
+# Per-partner rating totals by UTC day, ISO week (starting Monday) and month.
+class PartnerRatingBucket(Base):
+    __tablename__ = "partner_rating_buckets"
+
+    partner_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(5), primary_key=True)
+    bucket_start: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    rating_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rating_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    star_1: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    star_2: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    star_3: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    star_4: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    star_5: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+class LeaderboardPrior(Base):
+    __tablename__ = "leaderboard_prior"
+
+    # Single row per tenant schema.
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True, default=1)
+    mean: Mapped[float] = mapped_column(Double, nullable=False)
+    weight: Mapped[float] = mapped_column(Double, nullable=False)
+    # Unix time the stored decay sums are relative to; see app.leaderboard.
+    decay_epoch: Mapped[float] = mapped_column(Double, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=UTC_NOW)
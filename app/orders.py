@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import time
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from prometheus_client import Counter
+
+from app.cache import MISSING, SingleFlight, TTLCache
+from app.config import settings
+from app.timing import phase
+
+ORDER_LOOKUP_SAVED = Counter(
+    "orders_cache_saved_seconds_total",
+    "Estimated Orders Service latency avoided by order cache hits",
+)
+
+
+class OrderInfo(NamedTuple):
+    partner_id: Optional[str]
+    user_id: str
+
+
+# None is cached too (order not found), with the shorter negative TTL.
+order_cache = TTLCache("orders", settings.order_cache_size, settings.order_cache_ttl_seconds)
+_order_flight = SingleFlight("orders")
+_inflight: dict[tuple, asyncio.Task] = {}
+_rpc_seconds = 0.0
+
+
+def to_order_info(resp) -> Optional[OrderInfo]:
+    if not resp or not resp.HasField("order"):
+        return None
+    order = resp.order
+    partner_id = order.partner_id if order.HasField("partner_id") and order.partner_id else None
+    return OrderInfo(partner_id=partner_id, user_id=order.user_id)
+
+
+def _remember(key: tuple, info: Optional[OrderInfo], elapsed: float) -> None:
+    global _rpc_seconds
+    # Moving average of the RPC latency, used to estimate what a hit saves.
+    _rpc_seconds = elapsed if not _rpc_seconds else 0.9 * _rpc_seconds + 0.1 * elapsed
+    ttl = settings.order_cache_negative_ttl_seconds if info is None else None
+    order_cache.set(key, info, ttl)
+
+
+def _cached(key: tuple):
+    info = order_cache.get(key)
+    if info is not MISSING:
+        ORDER_LOOKUP_SAVED.inc(_rpc_seconds)
+    return info
+
+
+def lookup_order(fetch: Callable, order_id: int, tenant_id: str) -> Optional[OrderInfo]:
+    key = (tenant_id, order_id)
+    info = _cached(key)
+    if info is not MISSING:
+        return info
+
+    def load():
+        start = time.perf_counter()
+        with phase("orders_grpc"):
+            info = to_order_info(fetch(order_id=order_id, tenant_id=tenant_id))
+        _remember(key, info, time.perf_counter() - start)
+        return info
+
+    return _order_flight.do(key, load)
+
+
+async def _load_order_async(fetch: Callable[..., Awaitable], key: tuple) -> Optional[OrderInfo]:
+    tenant_id, order_id = key
+    start = time.perf_counter()
+    with phase("orders_grpc"):
+        info = to_order_info(await fetch(order_id=order_id, tenant_id=tenant_id))
+    _remember(key, info, time.perf_counter() - start)
+    return info
+
+
+def _flight_done(key: tuple, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        # Mark retrieved so a failure nobody awaited is not logged.
+        task.exception()
+
+
+async def lookup_order_async(fetch: Callable[..., Awaitable], order_id: int, tenant_id: str) -> Optional[OrderInfo]:
+    key = (tenant_id, order_id)
+    info = _cached(key)
+    if info is not MISSING:
+        return info
+
+    # The RPC runs in its own task, so a caller that goes away (e.g. a client
+    # disconnect) cancels only its own wait, not the lookup others share.
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_load_order_async(fetch, key))
+        _inflight[key] = task
+        task.add_done_callback(functools.partial(_flight_done, key))
+    return await asyncio.shield(task)
@@ -0,0 +1,51 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException
+
+
+def _pack(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _unpack(cursor: str) -> list:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    return _pack([created_at.isoformat(), id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, id = _unpack(cursor)
+        return datetime.fromisoformat(created_at), str(uuid.UUID(id))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def encode_score_cursor(score: float, key: str) -> str:
+    return _pack([score, key])
+
+
+def decode_score_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        score, key = _unpack(cursor)
+        if not isinstance(key, str):
+            raise TypeError(key)
+        return float(score), key
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def parse_fields(fields: str | None, allowed) -> list[str] | None:
+    if fields is None:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown) or fields}")
+    return requested
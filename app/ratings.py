@@ -0,0 +1,153 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.config import settings
+from app.leaderboard import NOW_EPOCH, decay_epoch, decay_weight, decay_weight_sql, refresh_leaderboard, score_values, seed_prior
+from app.models import PARTNER_VERSION_SEQ, STAR_COLUMNS, STARS, PartnerRating, Review
+from app.replica import READ_ROUTE
+from app.schemas import PartnerRatingOut
+from app.trends import apply_rollups
+
+# Keyed by (tenant schema, partner_id); invalidated locally on write and
+# bounded by TTL for writes served by other processes.
+rating_cache = TTLCache("partner_ratings", settings.rating_cache_size, settings.rating_cache_ttl_seconds)
+
+
+def apply_ratings(db: Session, ratings: Iterable[tuple[str, int]]) -> None:
+    deltas: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(int))
+    for partner_id, rating in ratings:
+        delta = deltas[partner_id]
+        delta["rating_sum"] += rating
+        delta["rating_count"] += 1
+        delta[STAR_COLUMNS[rating]] += 1
+
+    if not deltas:
+        return
+
+    apply_rollups(db, deltas)
+    seed_prior(
+        db,
+        sum(delta["rating_sum"] for delta in deltas.values()),
+        sum(delta["rating_count"] for delta in deltas.values()),
+    )
+    weight = decay_weight(decay_epoch(db))
+    for delta in deltas.values():
+        delta["decay_sum"] = delta["rating_sum"] * weight
+        delta["decay_count"] = delta["rating_count"] * weight
+
+    columns = ["rating_sum", "rating_count", *STAR_COLUMNS.values(), "decay_sum", "decay_count"]
+    # Sorted so concurrent writers lock partner rows in the same order.
+    rows = []
+    for partner_id in sorted(deltas):
+        row = {c: deltas[partner_id].get(c, 0) for c in columns}
+        scores = score_values(row["rating_sum"], row["rating_count"], row["decay_sum"], row["decay_count"], weight)
+        rows.append({"partner_id": partner_id, **row, **scores})
+
+    stmt = insert(PartnerRating).values(rows)
+    totals = {c: getattr(PartnerRating, c) + getattr(stmt.excluded, c) for c in columns}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PartnerRating.partner_id],
+        set_={
+            **totals,
+            **score_values(
+                totals["rating_sum"], totals["rating_count"], totals["decay_sum"], totals["decay_count"], weight
+            ),
+            "updated_at": func.timezone("utc", func.now()),
+            "version": PARTNER_VERSION_SEQ.next_value(),
+        },
+    )
+    db.execute(stmt)
+
+
+def rebuild_ratings(db: Session) -> int:
+    db.execute(text("LOCK TABLE reviews IN SHARE MODE"))
+    db.execute(PartnerRating.__table__.delete())
+
+    stars = [
+        func.count().filter(Review.rating == star).label(column)
+        for star, column in STAR_COLUMNS.items()
+    ]
+    # Decay sums are rebuilt relative to now, which becomes the tenant's epoch.
+    epoch = float(db.execute(select(NOW_EPOCH)).scalar_one())
+    weight = decay_weight_sql(Review.created_at, epoch)
+    source = select(
+        Review.partner_id,
+        func.sum(Review.rating),
+        func.count(),
+        *stars,
+        func.sum(Review.rating * weight),
+        func.sum(weight),
+        func.timezone("utc", func.now()),
+    ).group_by(Review.partner_id)
+
+    result = db.execute(
+        insert(PartnerRating).from_select(
+            [
+                "partner_id", "rating_sum", "rating_count", *STAR_COLUMNS.values(),
+                "decay_sum", "decay_count", "updated_at",
+            ],
+            source,
+        )
+    )
+    refresh_leaderboard(db, sums_epoch=epoch)
+    return result.rowcount
+
+
+def to_rating_out(partner_id: str, rating: Optional[PartnerRating]) -> PartnerRatingOut:
+    if rating is None or not rating.rating_count:
+        return PartnerRatingOut(partner_id=partner_id, avg_rating=0.0, count=0)
+
+    return PartnerRatingOut(
+        partner_id=partner_id,
+        avg_rating=rating.rating_sum / rating.rating_count,
+        count=rating.rating_count,
+        distribution={star: getattr(rating, column) for star, column in STAR_COLUMNS.items()},
+    )
+
+
+class CachedRating(NamedTuple):
+    # The validators travel with the body, so an ETag never outlives the body it names.
+    version: int
+    updated_at: Optional[datetime]
+    body: PartnerRatingOut
+
+
+def to_cached_rating(partner_id: str, rating: Optional[PartnerRating]) -> CachedRating:
+    if rating is None:
+        return CachedRating(0, None, to_rating_out(partner_id, None))
+    return CachedRating(rating.version, rating.updated_at, to_rating_out(partner_id, rating))
+
+
+def get_cached_ratings(db: Session, tenant_id: str, partner_ids: list[str]) -> dict[str, CachedRating]:
+    route = db.info.get(READ_ROUTE)
+    keys = [(tenant_id, pid) for pid in partner_ids]
+    # A read-your-writes request must not get an entry cached before its write,
+    # and replica rows can lag, so only primary reads fill the cache.
+    if route == "read_your_writes":
+        found, missing = {}, keys
+    else:
+        found, missing = rating_cache.get_many(keys)
+    result = {pid: found[(tenant_id, pid)] for pid in partner_ids if (tenant_id, pid) in found}
+
+    if missing:
+        missing_ids = [pid for _, pid in missing]
+        rows = db.execute(
+            select(PartnerRating).where(PartnerRating.partner_id.in_(missing_ids))
+        ).scalars().all()
+        ratings = {row.partner_id: row for row in rows}
+        loaded = {pid: to_cached_rating(pid, ratings.get(pid)) for pid in missing_ids}
+        if route != "ok":
+            rating_cache.set_many({(tenant_id, pid): out for pid, out in loaded.items()})
+        result.update(loaded)
+
+    return {pid: result[pid] for pid in partner_ids}
+
+
+def get_ratings(db: Session, tenant_id: str, partner_ids: list[str]) -> dict[str, PartnerRatingOut]:
+    return {pid: entry.body for pid, entry in get_cached_ratings(db, tenant_id, partner_ids).items()}
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+from app.database import engine, get_db_session, replica_engine
+
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG = Gauge("db_replica_lag_seconds", "Replay lag of the read replica at the last check")
+REPLICA_USABLE = Gauge("db_replica_usable", "1 if reads are currently routed to the replica")
+READ_ROUTES = Counter("db_read_routes_total", "Read sessions by target database and reason", ["target", "reason"])
+
+# Zero when the standby has replayed everything it received, so an idle
+# primary doesn't look like lag. NULL means nothing was replayed yet.
+LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+RYW_COOKIE = "review_rw_until"
+
+# Session.info key holding the routing reason, so callers can tell replica and
+# read-your-writes reads apart.
+READ_ROUTE = "read_route"
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: Engine,
+        replica: Optional[Engine],
+        max_lag: float,
+        check_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._clock = clock
+        self._checked_at = float("-inf")
+        self._state = "unchecked"
+        self._lock = threading.Lock()
+
+    def _check(self) -> str:
+        try:
+            with self.replica.connect() as conn:
+                lag = conn.execute(LAG_SQL).scalar()
+        except DBAPIError:
+            logger.warning("Read replica unreachable; reading from primary", exc_info=True)
+            return "replica_down"
+        if lag is None:
+            return "replica_lagging"
+        REPLICA_LAG.set(float(lag))
+        return "replica_lagging" if lag > self.max_lag else "ok"
+
+    def state(self) -> str:
+        if self._clock() - self._checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            # One request re-checks; concurrent ones keep using the last result.
+            try:
+                self._state = self._check()
+                self._checked_at = self._clock()
+                REPLICA_USABLE.set(self._state == "ok")
+            finally:
+                self._lock.release()
+        return self._state
+
+    def mark_down(self) -> None:
+        self._state = "replica_down"
+        self._checked_at = self._clock()
+        REPLICA_USABLE.set(0)
+
+    @contextmanager
+    def read_session(self, schema: str, sticky: bool = False):
+        if self.replica is None:
+            reason = "no_replica"
+        elif sticky:
+            reason = "read_your_writes"
+        else:
+            reason = self.state()
+
+        with ExitStack() as stack:
+            session = None
+            if reason == "ok":
+                try:
+                    session = stack.enter_context(get_db_session(schema, bind=self.replica))
+                except DBAPIError:
+                    logger.warning("Read replica connection failed; reading from primary", exc_info=True)
+                    self.mark_down()
+                    reason = "replica_down"
+            if session is None:
+                session = stack.enter_context(get_db_session(schema, bind=self.primary))
+            READ_ROUTES.labels(target="replica" if reason == "ok" else "primary", reason=reason).inc()
+            session.info[READ_ROUTE] = reason
+            yield session
+
+
+def wrote_recently(cookies: dict[str, str], now: Optional[float] = None) -> bool:
+    try:
+        return float(cookies.get(RYW_COOKIE, 0)) > (time.time() if now is None else now)
+    except ValueError:
+        return False
+
+
+def read_your_writes_cookie() -> dict:
+    seconds = settings.read_your_writes_seconds
+    return {"key": RYW_COOKIE, "value": f"{time.time() + seconds:.3f}", "max_age": max(1, int(seconds)), "httponly": True}
+
+
+replica_router = ReplicaRouter(
+    engine,
+    replica_engine,
+    max_lag=settings.replica_max_lag_seconds,
+    check_interval=settings.replica_check_interval_seconds,
+)
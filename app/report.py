@@ -0,0 +1,139 @@
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from prometheus_client import Histogram
+from sqlalchemy import Engine, select
+
+from app.models import PartnerRating
+from app.ratings import STAR_COLUMNS, STARS
+from app.serialization import REPORT_RECORD
+
+logger = logging.getLogger(__name__)
+
+TENANT_SECONDS = Histogram("rating_report_tenant_seconds", "Time to aggregate one tenant schema for the rating report")
+
+PARTNER_TOTALS = select(
+    PartnerRating.partner_id,
+    PartnerRating.rating_sum,
+    PartnerRating.rating_count,
+    *(getattr(PartnerRating, column) for column in STAR_COLUMNS.values()),
+).where(PartnerRating.rating_count > 0).order_by(PartnerRating.partner_id)
+
+Result = Union[list, BaseException]
+
+
+# Yields (schema, rows or error) in completion order.
+def aggregate_schemas(
+    engine: Engine,
+    schemas: Iterable[str],
+    concurrency: int,
+) -> Iterator[tuple[str, Result]]:
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+
+    def run(schema: str) -> list:
+        # One connection per worker, reused for every schema it handles. Tables
+        # are schema-qualified at compile time, so no search_path switch.
+        if not hasattr(local, "conn"):
+            local.conn = engine.connect()
+            with connections_lock:
+                connections.append(local.conn)
+        conn = local.conn.execution_options(schema_translate_map={None: schema})
+        with TENANT_SECONDS.time():
+            try:
+                return conn.execute(PARTNER_TOTALS).all()
+            finally:
+                conn.rollback()
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="rating-report")
+    todo = iter(schemas)
+    pending: dict = {}
+    try:
+        while True:
+            # Bounded window: a slow reader of the stream doesn't pile up results.
+            while len(pending) < max(1, concurrency):
+                schema = next(todo, None)
+                if schema is None:
+                    break
+                pending[pool.submit(run, schema)] = schema
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                schema = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.exception("Rating report for %s failed", schema)
+                    result = e
+                yield schema, result
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+        for conn in connections:
+            conn.close()
+
+
+def _totals(rating_sum: int, count: int, stars: Iterable[int]) -> dict:
+    return {
+        "avg_rating": round(rating_sum / count, 4) if count else 0.0,
+        "count": count,
+        "distribution": dict(zip(STARS, stars)),
+    }
+
+
+def report_lines(
+    results: Iterable[tuple[str, Result]],
+    progress: Optional[Callable[[str, Result], None]] = None,
+) -> Iterator[dict]:
+    total_sum, total_count, total_stars = 0, 0, [0] * len(STARS)
+    tenants, failed = 0, []
+    for schema, rows in results:
+        if progress is not None:
+            progress(schema, rows)
+        if isinstance(rows, BaseException):
+            failed.append(schema)
+            yield {"type": "tenant", "tenant": schema, "error": str(rows)}
+            continue
+
+        tenant_sum, tenant_count, tenant_stars = 0, 0, [0] * len(STARS)
+        for partner_id, rating_sum, count, s1, s2, s3, s4, s5 in rows:
+            tenant_sum += rating_sum
+            tenant_count += count
+            tenant_stars[0] += s1
+            tenant_stars[1] += s2
+            tenant_stars[2] += s3
+            tenant_stars[3] += s4
+            tenant_stars[4] += s5
+            yield {
+                "type": "partner",
+                "tenant": schema,
+                "partner_id": partner_id,
+                "avg_rating": round(rating_sum / count, 4),
+                "count": count,
+                "distribution": {1: s1, 2: s2, 3: s3, 4: s4, 5: s5},
+            }
+        yield {"type": "tenant", "tenant": schema, "partners": len(rows), **_totals(tenant_sum, tenant_count, tenant_stars)}
+
+        tenants += 1
+        total_sum += tenant_sum
+        total_count += tenant_count
+        total_stars = [a + b for a, b in zip(total_stars, tenant_stars)]
+
+    yield {"type": "total", "tenants": tenants, "failed": sorted(failed), **_totals(total_sum, total_count, total_stars)}
+
+
+def report_chunks(records: Iterable[dict], lines_per_chunk: int = 1000) -> Iterator[bytes]:
+    lines = []
+    for record in records:
+        lines.append(REPORT_RECORD.dump_json(record))
+        # Flushed at every tenant boundary so progress shows up in the stream.
+        if len(lines) >= lines_per_chunk or record["type"] != "partner":
+            yield b"\n".join(lines) + b"\n"
+            lines.clear()
+    if lines:
+        yield b"\n".join(lines) + b"\n"
@@ -0,0 +1,25 @@
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import Review
+from app.ratings import apply_ratings
+from app.schemas import ReviewOut
+
+INSERT_CHUNK_SIZE = 1000
+
+REVIEW_OUT_COLUMNS = [getattr(Review, name) for name in ReviewOut.model_fields]
+
+
+def insert_reviews(db: Session, rows: list[dict]) -> list:
+    inserted = []
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        stmt = (
+            insert(Review)
+            .values(rows[start:start + INSERT_CHUNK_SIZE])
+            .on_conflict_do_nothing()
+            .returning(Review.id, Review.order_id, Review.partner_id, Review.rating)
+        )
+        inserted.extend(db.execute(stmt).all())
+
+    apply_ratings(db, [(row.partner_id, row.rating) for row in inserted])
+    return inserted
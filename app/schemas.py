@@ -1,13 +1,42 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Dict, Literal, Optional, List
+from typing_extensions import TypedDict
 
 class ReviewCreate(BaseModel):
     order_id: int
-    user_id: str
+    user_id: str = Field(max_length=36)
     rating: int = Field(ge=1, le=5)
     comment: Optional[str] = None
 
+class ReviewBatchCreate(BaseModel):
+    reviews: List[ReviewCreate] = Field(min_length=1)
+
+class ReviewBatchItemOut(BaseModel):
+    order_id: int
+    status: Literal["created", "duplicate", "order_not_found", "missing_partner"]
+    id: Optional[str] = None
+
+class ReviewBatchOut(BaseModel):
+    created: int
+    items: List[ReviewBatchItemOut]
+
+class ReviewLookupRequest(BaseModel):
+    order_ids: List[int] = Field(min_length=1)
+
+class ReviewLookupItemOut(BaseModel):
+    order_id: int
+    reviewed: bool
+    id: Optional[str] = None
+
+class ReviewLookupOut(BaseModel):
+    items: List[ReviewLookupItemOut]
+
+class ReviewAcceptedOut(BaseModel):
+    id: str
+    order_id: int
+    status: Literal["accepted"] = "accepted"
+
 class ReviewOut(BaseModel):
     id: str
     order_id: int
@@ -21,7 +50,49 @@ class ReviewOut(BaseModel):
     class Config:
         from_attributes = True
 
+# Plain-row shape of ReviewOut, serialized without model validation.
+class ReviewRow(TypedDict):
+    id: str
+    order_id: int
+    user_id: str
+    partner_id: str
+    rating: int
+    comment: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+class ReviewSearchHitOut(ReviewOut):
+    rank: float
+
+class ReviewSearchRow(ReviewRow):
+    rank: float
+
 class PartnerRatingOut(BaseModel):
     partner_id: str
     avg_rating: float
     count: int
+    distribution: Dict[int, int] = Field(default_factory=lambda: {star: 0 for star in range(1, 6)})
+
+class RatingTrendPointOut(BaseModel):
+    bucket_start: date
+    avg_rating: float
+    count: int
+    distribution: Dict[int, int]
+
+class RatingTrendRow(TypedDict):
+    bucket_start: date
+    avg_rating: float
+    count: int
+    distribution: Dict[int, int]
+
+class LeaderboardEntryOut(BaseModel):
+    partner_id: str
+    score: float
+    avg_rating: float
+    count: int
+
+class LeaderboardEntryRow(TypedDict):
+    partner_id: str
+    score: float
+    avg_rating: float
+    count: int
@@ -0,0 +1,35 @@
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.schemas import LeaderboardEntryRow, PartnerRatingOut, RatingTrendRow, ReviewRow, ReviewSearchRow
+from app.timing import phase
+
+REVIEW_ROWS = TypeAdapter(list[ReviewRow])
+PROJECTED_ROWS = TypeAdapter(list[dict[str, Any]])
+SEARCH_ROWS = TypeAdapter(list[ReviewSearchRow])
+RATINGS_BY_PARTNER = TypeAdapter(dict[str, PartnerRatingOut])
+PARTNER_RATING = TypeAdapter(PartnerRatingOut)
+RATING_TREND = TypeAdapter(list[RatingTrendRow])
+LEADERBOARD = TypeAdapter(list[LeaderboardEntryRow])
+REPORT_RECORD = TypeAdapter(dict[str, Any])
+
+
+def row_dicts(keys, rows) -> list[dict]:
+    # Much cheaper than Row._asdict() for large pages.
+    keys = list(keys)
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def json_response(
+    adapter: TypeAdapter,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    # Content is trusted (built from our own rows), so it is dumped straight
+    # to JSON bytes without response_model validation or jsonable_encoder.
+    with phase("serialize"):
+        body = adapter.dump_json(content)
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
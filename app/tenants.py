@@ -0,0 +1,67 @@
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import Engine, text
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+TENANT_NAME_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+SCHEMAS_SQL = text(
+    "SELECT nspname FROM pg_namespace "
+    "WHERE nspname NOT LIKE 'pg\\_%' AND nspname <> 'information_schema'"
+)
+
+
+class TenantRegistry:
+    def __init__(self, engine: Engine, ttl: float, miss_refresh_interval: float):
+        self._engine = engine
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self._schemas: frozenset[str] = frozenset()
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refresh(self, max_age: float) -> None:
+        with self._lock:
+            if time.monotonic() - self._loaded_at < max_age:
+                return
+            with self._engine.connect() as conn:
+                self._schemas = frozenset(conn.execute(SCHEMAS_SQL).scalars())
+            self._loaded_at = time.monotonic()
+
+    def schemas(self) -> frozenset[str]:
+        self._refresh(self.ttl)
+        return self._schemas
+
+    def exists(self, schema: str) -> bool:
+        try:
+            if schema in self.schemas():
+                return True
+            # Unknown names trigger a rate-limited reload so newly provisioned
+            # tenants are picked up before the TTL expires.
+            self._refresh(self.miss_refresh_interval)
+        except Exception:
+            logger.warning("Tenant registry refresh failed; accepting %r", schema, exc_info=True)
+            return True
+        return schema in self._schemas
+
+    def known(self, schema: str) -> bool:
+        # Checks the loaded snapshot only, without touching the database.
+        return schema in self._schemas
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = float("-inf")
+
+
+tenant_registry = TenantRegistry(
+    engine,
+    ttl=settings.tenant_registry_ttl_seconds,
+    miss_refresh_interval=settings.tenant_registry_miss_refresh_seconds,
+)
@@ -0,0 +1,186 @@
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from prometheus_client import Histogram
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+
+PHASE_SECONDS = Histogram(
+    "request_phase_duration_seconds",
+    "Time spent per request phase (orders_grpc, search_path, insert_commit, db, serialize)",
+    ["endpoint", "tenant", "phase"],
+)
+DB_QUERIES = Histogram(
+    "request_db_queries",
+    "SQL statements executed per request",
+    ["endpoint", "tenant"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 50, 100),
+)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.queries = 0
+        self.endpoint_finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_query(self, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.phases["db"] = self.phases.get("db", 0.0) + seconds
+
+    def server_timing(self) -> str:
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items()]
+        parts.append(f'db_queries;desc="{self.queries}"')
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str):
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+class TenantLabels:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, tenant: str) -> str:
+        if tenant in self._seen:
+            return tenant
+        # Imported here: app.tenants needs app.database, which imports this module.
+        from app.tenants import TENANT_NAME_RE, tenant_registry
+
+        # Ids that get_tenant_id rejects must not use up the label budget.
+        if not TENANT_NAME_RE.match(tenant) or not tenant_registry.known(tenant):
+            return "invalid"
+        with self._lock:
+            if len(self._seen) < self.limit:
+                self._seen.add(tenant)
+                return tenant
+        return "other"
+
+
+tenant_labels = TenantLabels(settings.metrics_max_tenants)
+
+
+def instrument_engine(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        timings = _current.get()
+        if timings is not None:
+            timings.add_query(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+
+class TimedRoute(APIRoute):
+    def get_route_handler(self):
+        call = self.dependant.call
+
+        def finished():
+            timings = _current.get()
+            if timings is not None:
+                timings.endpoint_finished = time.perf_counter()
+
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_call(*args, **kwargs):
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    finished()
+        else:
+            @functools.wraps(call)
+            def timed_call(*args, **kwargs):
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    finished()
+
+        self.dependant.call = timed_call
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _current.get()
+            if timings is not None and timings.endpoint_finished is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_finished)
+            return response
+
+        return timed_handler
+
+
+class TimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and settings.server_timing_enabled:
+                MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                self._observe(scope, route.path, timings)
+
+    @staticmethod
+    def _observe(scope, endpoint: str, timings: RequestTimings) -> None:
+        tenant = "public"
+        for key, value in scope.get("headers", ()):
+            if key == b"x-tenant-id":
+                tenant = value.decode("latin-1").lower() or "public"
+                break
+        tenant = tenant_labels(tenant)
+        for name, seconds in timings.phases.items():
+            PHASE_SECONDS.labels(endpoint=endpoint, tenant=tenant, phase=name).observe(seconds)
+        DB_QUERIES.labels(endpoint=endpoint, tenant=tenant).observe(timings.queries)
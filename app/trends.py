@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+from typing import Mapping
+
+from sqlalchemy import Date, cast, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import STAR_COLUMNS, UTC_NOW, PartnerRatingBucket, Review
+
+GRANULARITIES = ("day", "week", "month")
+ROLLUP_COLUMNS = ["rating_sum", "rating_count", *STAR_COLUMNS.values()]
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def shift_bucket(start: date, granularity: str, buckets: int) -> date:
+    try:
+        if granularity == "week":
+            return start + timedelta(weeks=buckets)
+        if granularity == "month":
+            months = start.year * 12 + start.month - 1 + buckets
+            return date(months // 12, months % 12 + 1, 1)
+        return start + timedelta(days=buckets)
+    except (OverflowError, ValueError):
+        # Clamped to the first or last bucket a date can hold.
+        return bucket_start(date.min if buckets < 0 else date.max, granularity)
+
+
+def bucket_count(first: date, last: date, granularity: str) -> int:
+    if granularity == "week":
+        return (last - first).days // 7 + 1
+    if granularity == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days + 1
+
+
+def apply_rollups(db: Session, deltas: Mapping[str, Mapping[str, float]]) -> None:
+    # Buckets come from the transaction's now(), the same clock that stamps
+    # created_at on the inserted reviews.
+    rows = [
+        {
+            "partner_id": partner_id,
+            "granularity": granularity,
+            "bucket_start": cast(func.date_trunc(granularity, UTC_NOW), Date),
+            **{c: deltas[partner_id].get(c, 0) for c in ROLLUP_COLUMNS},
+        }
+        for partner_id in sorted(deltas)
+        for granularity in GRANULARITIES
+    ]
+    if not rows:
+        return
+
+    stmt = insert(PartnerRatingBucket).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PartnerRatingBucket.partner_id, PartnerRatingBucket.granularity, PartnerRatingBucket.bucket_start],
+        set_={c: getattr(PartnerRatingBucket, c) + getattr(stmt.excluded, c) for c in ROLLUP_COLUMNS},
+    )
+    db.execute(stmt)
+
+
+def rebuild_rollups(db: Session) -> int:
+    db.execute(text("LOCK TABLE reviews IN SHARE MODE"))
+    db.execute(PartnerRatingBucket.__table__.delete())
+
+    stars = [func.count().filter(Review.rating == star) for star in range(1, 6)]
+    inserted = 0
+    for granularity in GRANULARITIES:
+        start = cast(func.date_trunc(granularity, Review.created_at), Date)
+        source = select(
+            Review.partner_id, literal(granularity), start, func.sum(Review.rating), func.count(), *stars,
+        ).group_by(Review.partner_id, start)
+        result = db.execute(
+            insert(PartnerRatingBucket).from_select(
+                ["partner_id", "granularity", "bucket_start", *ROLLUP_COLUMNS], source
+            )
+        )
+        inserted += result.rowcount
+    return inserted
@@ -0,0 +1,350 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from itertools import groupby
+from typing import Callable, Hashable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = Gauge("review_write_queue_depth", "Accepted reviews waiting to be written")
+FLUSH_SECONDS = Histogram("review_write_flush_seconds", "Time to write one batch of queued reviews")
+FLUSHED = Counter("review_write_flushed_total", "Queued reviews written, by outcome", ["result"])
+REJECTED = Counter("review_write_rejected_total", "Reviews rejected because the write queue was full")
+
+# serialization_failure, deadlock_detected
+TRANSIENT_PGCODES = {"40001", "40P01"}
+
+FlushFn = Callable[[str, list[dict]], list]
+
+
+class QueueFull(Exception):
+    pass
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, (exc.OperationalError, exc.InterfaceError, exc.TimeoutError)):
+        return True
+    if isinstance(error, exc.DBAPIError):
+        return error.connection_invalidated or getattr(error.orig, "pgcode", None) in TRANSIENT_PGCODES
+    return False
+
+
+def flush_tenant(tenant_id: str, rows: list[dict]) -> list:
+    from app.database import get_db_session
+    from app.ratings import rating_cache
+    from app.reviews import insert_reviews
+
+    with get_db_session(schema=tenant_id) as db:
+        inserted = insert_reviews(db, rows)
+        db.commit()
+    for partner_id in {row.partner_id for row in inserted}:
+        rating_cache.invalidate((tenant_id, partner_id))
+    return inserted
+
+
+class ReviewWriteQueue:
+    def __init__(
+        self,
+        maxsize: int,
+        batch_size: int,
+        linger: float,
+        spill_path: Optional[str] = None,
+        fsync: bool = False,
+        flush: FlushFn = flush_tenant,
+        max_backoff: float = 5.0,
+        dead_letter_path: Optional[str] = None,
+        max_attempts: int = 10,
+    ):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.linger = linger
+        self.spill_path = spill_path
+        self.fsync = fsync
+        self.max_backoff = max_backoff
+        self.dead_letter_path = dead_letter_path
+        self.max_attempts = max_attempts
+        self._flush = flush
+        self._items: deque[tuple[str, dict]] = deque()
+        self._pending: dict[Hashable, dict] = {}
+        self._pending_keys: dict[Hashable, dict] = {}
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._spill = None
+        # Spill segments: rows still queued per segment, and segments on disk
+        # that wait for room in the queue.
+        self._segment_of: dict[Hashable, int] = {}
+        self._outstanding: dict[int, int] = {}
+        self._unloaded: deque[int] = deque()
+        self._active: Optional[int] = None
+        self._active_rows = 0
+        self._next_segment = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items) + self._in_flight
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _find(self, tenant_id: str, order_id: int, idempotency_key: Optional[str]) -> Optional[dict]:
+        existing = self._pending.get((tenant_id, order_id))
+        if existing is None and idempotency_key:
+            existing = self._pending_keys.get((tenant_id, idempotency_key))
+        return existing
+
+    def pending(self, tenant_id: str, order_id: int, idempotency_key: Optional[str] = None) -> Optional[dict]:
+        with self._cond:
+            return self._find(tenant_id, order_id, idempotency_key)
+
+    def submit(self, tenant_id: str, row: dict) -> dict:
+        with self._cond:
+            existing = self._find(tenant_id, row["order_id"], row["idempotency_key"])
+            if existing is not None:
+                return existing
+            # Spilled rows not yet replayed are ahead of new ones.
+            if len(self._items) >= self.maxsize or self._unloaded:
+                REJECTED.inc()
+                raise QueueFull()
+            if self._spill is not None:
+                self._spill_write(tenant_id, row)
+            self._enqueue(tenant_id, row)
+            self._cond.notify_all()
+        return row
+
+    def _enqueue(self, tenant_id: str, row: dict) -> None:
+        self._items.append((tenant_id, row))
+        self._pending[(tenant_id, row["order_id"])] = row
+        if row["idempotency_key"]:
+            self._pending_keys[(tenant_id, row["idempotency_key"])] = row
+        QUEUE_DEPTH.set(len(self._items) + self._in_flight)
+
+    def _segment_path(self, segment: int) -> str:
+        return f"{self.spill_path}.{segment}"
+
+    def _segments_on_disk(self) -> list[int]:
+        directory, prefix = os.path.split(self.spill_path)
+        segments = []
+        for name in os.listdir(directory or "."):
+            suffix = name[len(prefix) + 1:]
+            if name.startswith(prefix + ".") and suffix.isdigit():
+                segments.append(int(suffix))
+        return sorted(segments)
+
+    def _open_segment(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+        self._active = self._next_segment
+        self._next_segment += 1
+        self._active_rows = 0
+        self._outstanding[self._active] = 0
+        self._spill = open(self._segment_path(self._active), "a", encoding="utf-8")
+
+    def _spill_write(self, tenant_id: str, row: dict) -> None:
+        if self._active_rows >= self.batch_size:
+            self._open_segment()
+        self._spill.write(json.dumps({"tenant": tenant_id, "row": row}) + "\n")
+        self._spill.flush()
+        if self.fsync:
+            os.fsync(self._spill.fileno())
+        self._segment_of[(tenant_id, row["order_id"])] = self._active
+        self._outstanding[self._active] += 1
+        self._active_rows += 1
+
+    def _read_segment(self, segment: int) -> list[dict]:
+        entries = []
+        with open(self._segment_path(segment), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-write.
+                    logger.warning("Skipping unreadable spill entry in %s", self._segment_path(segment))
+        return entries
+
+    def _load_segments(self) -> int:
+        loaded = 0
+        while self._unloaded:
+            segment = self._unloaded[0]
+            entries = self._read_segment(segment)
+            # An oversized segment is still taken whole once the queue is empty.
+            if self._items and len(self._items) + len(entries) > self.maxsize:
+                break
+            self._unloaded.popleft()
+            self._outstanding[segment] = 0
+            for entry in entries:
+                key = (entry["tenant"], entry["row"]["order_id"])
+                if key not in self._pending:
+                    self._enqueue(entry["tenant"], entry["row"])
+                    self._segment_of[key] = segment
+                    self._outstanding[segment] += 1
+                    loaded += 1
+        return loaded
+
+    def _release_segments(self) -> None:
+        for segment, rows in list(self._outstanding.items()):
+            if rows or segment in self._unloaded:
+                continue
+            if segment != self._active:
+                del self._outstanding[segment]
+                os.remove(self._segment_path(segment))
+            elif self._spill is not None and self._active_rows:
+                # Everything written to the active segment is in the database.
+                self._spill.seek(0)
+                self._spill.truncate()
+                self._active_rows = 0
+
+    def start(self) -> None:
+        if self.running:
+            return
+        with self._cond:
+            self._stopping = False
+            replayed = 0
+            if self.spill_path:
+                # Segments still tracked from before a stop that did not drain
+                # are already queued.
+                on_disk = [s for s in self._segments_on_disk() if s not in self._outstanding]
+                self._unloaded = deque(on_disk)
+                self._next_segment = max([self._next_segment, *[s + 1 for s in on_disk]])
+                replayed = self._load_segments()
+                self._open_segment()
+                self._release_segments()
+        if replayed:
+            logger.info("Replaying %d queued reviews from %s", replayed, self.spill_path)
+        self._thread = threading.Thread(target=self._run, name="review-write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        drained = len(self) == 0
+        if not drained:
+            logger.warning("Write-behind queue stopped with %d reviews left in %s", len(self), self.spill_path)
+        with self._cond:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            if self._active is not None and not self._outstanding.get(self._active):
+                self._outstanding.pop(self._active, None)
+                os.remove(self._segment_path(self._active))
+            self._active = None
+        return drained
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._items or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _take_batch(self) -> list[tuple[str, dict]]:
+        with self._cond:
+            while not self._items and not self._stopping:
+                self._cond.wait()
+            if len(self._items) < self.batch_size and not self._stopping:
+                self._cond.wait(self.linger)
+            batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+            self._in_flight = len(batch)
+            return batch
+
+    def _insert(self, tenant_id: str, rows: list[dict]) -> None:
+        inserted = self._flush(tenant_id, rows)
+        FLUSHED.labels(result="inserted").inc(len(inserted))
+        FLUSHED.labels(result="duplicate").inc(len(rows) - len(inserted))
+
+    def _dead_letter(self, tenant_id: str, row: dict, error: Exception) -> None:
+        FLUSHED.labels(result="failed").inc()
+        logger.error("Dropping queued review for order %s in %s: %s", row["order_id"], tenant_id, error)
+        if self.dead_letter_path:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"tenant": tenant_id, "row": row, "error": str(error)}) + "\n")
+
+    def _write_tenant(self, tenant_id: str, rows: list[dict]) -> bool:
+        failures = 0
+        while True:
+            try:
+                self._insert(tenant_id, rows)
+                return True
+            except Exception as e:
+                failures += 1
+                logger.exception("Write-behind flush of %d reviews failed (attempt %d)", len(rows), failures)
+                if not is_transient(e) or failures >= self.max_attempts:
+                    break
+                if self._stopping:
+                    return False
+                time.sleep(min(self.max_backoff, 0.1 * 2 ** failures))
+
+        # Isolate the rows the database will not take, so they cannot hold up the rest.
+        for row in rows:
+            try:
+                self._insert(tenant_id, [row])
+            except Exception as e:
+                self._dead_letter(tenant_id, row, e)
+        return True
+
+    def _write(self, batch: list[tuple[str, dict]]) -> list[tuple[str, dict]]:
+        with FLUSH_SECONDS.time():
+            groups = groupby(sorted(batch, key=lambda e: e[0]), key=lambda e: e[0])
+            for tenant_id, entries in groups:
+                entries = list(entries)
+                if not self._write_tenant(tenant_id, [row for _, row in entries]):
+                    return entries + [entry for _, rest in groups for entry in rest]
+        return []
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            unwritten = self._write(batch)
+            with self._cond:
+                if unwritten:
+                    # Stopping mid-retry: leave the rows in their spill segments for the next start.
+                    keys = {(tenant_id, row["order_id"]) for tenant_id, row in unwritten}
+                    batch = [(tenant_id, row) for tenant_id, row in batch if (tenant_id, row["order_id"]) not in keys]
+                    self._items.extendleft(reversed(unwritten))
+                for tenant_id, row in batch:
+                    self._pending.pop((tenant_id, row["order_id"]), None)
+                    self._pending_keys.pop((tenant_id, row["idempotency_key"]), None)
+                    segment = self._segment_of.pop((tenant_id, row["order_id"]), None)
+                    if segment is not None:
+                        self._outstanding[segment] -= 1
+                self._in_flight = 0
+                if self.spill_path:
+                    self._release_segments()
+                    self._load_segments()
+                QUEUE_DEPTH.set(len(self._items))
+                self._cond.notify_all()
+                if unwritten:
+                    return
+
+
+review_writer = ReviewWriteQueue(
+    maxsize=settings.write_behind_queue_size,
+    batch_size=settings.write_behind_batch_size,
+    linger=settings.write_behind_linger_ms / 1000,
+    spill_path=settings.write_behind_spill_path,
+    fsync=settings.write_behind_fsync,
+    dead_letter_path=settings.write_behind_dead_letter_path,
+    max_attempts=settings.write_behind_max_attempts,
+)
@@ -0,0 +1,114 @@
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+
+from sqlalchemy import event, text
+
+from benchmarks import seed as seeding
+
+SCHEMA = "bench_lookup"
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._before)
+
+    def _before(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def take(self) -> int:
+        with self._lock:
+            count, self.count = self.count, 0
+        return count
+
+
+def _p50_ms(samples: list[float]) -> float:
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round trips and latency of POST /reviews:lookup by batch size")
+    seeding.add_arguments(parser)
+    parser.set_defaults(schema=SCHEMA, reviews=1_000_000, comment_length=0)
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.skip_seed:
+        seeding.seed(args.schema, args.reviews, args.partners, args.users, args.skew, args.comment_length)
+
+    from fastapi.testclient import TestClient
+
+    from app.database import engine, get_db_session
+    from app.main import app
+
+    # Sets the visibility map, so the lookup never has to visit the heap.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql(f"VACUUM ANALYZE {args.schema}.reviews")
+
+    client = TestClient(app)
+    headers = {"x-tenant-id": args.schema}
+    rng = random.Random(7)
+    counter = StatementCounter(engine)
+
+    results = []
+    for size in args.batch_sizes:
+        # Half of the ids exist, half are past the seeded range.
+        batches = [
+            [rng.randint(1, args.reviews * 2) for _ in range(size)] for _ in range(args.repeat)
+        ]
+
+        counter.take()
+        lookup = []
+        for order_ids in batches:
+            started = time.perf_counter()
+            r = client.post("/reviews:lookup", json={"order_ids": order_ids}, headers=headers)
+            lookup.append(time.perf_counter() - started)
+            r.raise_for_status()
+        lookup_statements = counter.take() / args.repeat
+
+        # What the order-history page did before: one query per order.
+        per_order = []
+        with get_db_session(schema=args.schema) as db:
+            counter.take()
+            for order_ids in batches:
+                started = time.perf_counter()
+                for order_id in order_ids:
+                    db.execute(text("SELECT id FROM reviews WHERE order_id = :id"), {"id": order_id}).first()
+                per_order.append(time.perf_counter() - started)
+            per_order_statements = counter.take() / args.repeat
+
+        results.append({
+            "batch_size": size,
+            "lookup_p50_ms": _p50_ms(lookup),
+            "lookup_statements": lookup_statements,
+            "per_order_p50_ms": _p50_ms(per_order),
+            "per_order_statements": per_order_statements,
+        })
+
+    with get_db_session(schema=args.schema) as db:
+        plan = db.execute(
+            text("EXPLAIN (ANALYZE, COSTS OFF) SELECT order_id, id FROM reviews WHERE order_id = ANY(:ids)"),
+            {"ids": list(range(1, 1001))},
+        ).scalars().all()
+
+    print(json.dumps({
+        "reviews": args.reviews,
+        "results": results,
+        "plan": [line.strip() for line in plan if "Scan" in line or "Heap Fetches" in line],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
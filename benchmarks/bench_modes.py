@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.fake_orders import serve
+
+SCHEMA = "bench_modes"
+
+
+def _prepare_schema():
+    from app.database import engine
+    from app.migrations import migrate_schema, provision_tenant
+
+    # The app refuses to start until public is at the latest migration.
+    migrate_schema(engine, "public")
+    provision_tenant(engine, SCHEMA)
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {SCHEMA}.reviews"))
+
+
+def _wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", headers={"x-tenant-id": SCHEMA}).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"service at {base_url} did not become ready")
+
+
+async def _drive(base_url: str, concurrency: int, duration: float, first_order_id: int):
+    latencies: list[float] = []
+    errors = 0
+    next_order = iter(range(first_order_id, first_order_id + 10_000_000))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                payload = {"order_id": next(next_order), "user_id": "bench", "rating": 5}
+                start = time.perf_counter()
+                try:
+                    r = await client.post("/reviews", json=payload, headers={"x-tenant-id": SCHEMA})
+                    ok = r.status_code == 201
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else None,
+    }
+
+
+def run_mode(mode: str, args, orders_port: int, first_order_id: int):
+    env = dict(
+        os.environ,
+        DB_MODE=mode,
+        ORDERS_GRPC_HOST="127.0.0.1",
+        ORDERS_GRPC_PORT=str(orders_port),
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port),
+         "--log-level", "warning", "--backlog", "4096"],
+        env=env,
+    )
+    try:
+        _wait_ready(base_url)
+        return asyncio.run(_drive(base_url, args.concurrency, args.duration, first_order_id))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare sync and async request paths for POST /reviews")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--orders-latency-ms", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", default="sync,async")
+    args = parser.parse_args(argv)
+
+    _prepare_schema()
+    server, orders_port = serve(latency_ms=args.orders_latency_ms, workers=args.concurrency)
+    try:
+        results = {}
+        for i, mode in enumerate(args.modes.split(",")):
+            results[mode] = run_mode(mode, args, orders_port, first_order_id=(i + 1) * 10_000_000)
+    finally:
+        server.stop(None)
+
+    print(json.dumps({"concurrency": args.concurrency, "duration_s": args.duration, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import time
+
+from benchmarks import seed as seeding
+
+PREFIX = "bench_report_"
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _per_tenant(schemas: list[str]) -> int:
+    # The previous way: one /partners/ratings-style read per tenant, each
+    # switching the pooled connection's search_path, rendered into the same report.
+    from app.database import get_db_session
+    from app.report import PARTNER_TOTALS, report_chunks, report_lines
+
+    def results():
+        for schema in schemas:
+            with get_db_session(schema=schema) as db:
+                yield schema, db.execute(PARTNER_TOTALS).all()
+
+    return sum(len(chunk) for chunk in report_chunks(report_lines(results())))
+
+
+def _pooled(schemas: list[str], concurrency: int) -> int:
+    from app.database import engine
+    from app.report import aggregate_schemas, report_chunks, report_lines
+
+    return sum(len(chunk) for chunk in report_chunks(report_lines(aggregate_schemas(engine, schemas, concurrency))))
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-tenant rating report time as the tenant count grows")
+    parser.add_argument("--tenants", type=_int_list, default=[4, 16, 64], help="Comma-separated tenant counts")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4, 8], help="Comma-separated worker counts")
+    parser.add_argument("--reviews", type=int, default=5000, help="Reviews per tenant")
+    parser.add_argument("--partners", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args(argv)
+
+    schemas = [f"{PREFIX}{i:03d}" for i in range(max(args.tenants))]
+    if not args.skip_seed:
+        for schema in schemas:
+            seeding.seed(schema, args.reviews, args.partners, comment_length=0)
+
+    results = []
+    for count in args.tenants:
+        subset = schemas[:count]
+        result = {"tenants": count, "per_tenant_sequential_ms": _best_ms(lambda: _per_tenant(subset), args.repeat)}
+        for concurrency in args.concurrency:
+            result[f"pool_{concurrency}_ms"] = _best_ms(lambda: _pooled(subset, concurrency), args.repeat)
+        results.append(result)
+
+    print(json.dumps({"reviews_per_tenant": args.reviews, "partners": args.partners, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+
+SCHEMA = "bench_search"
+
+# Common review words first; the power-law pick below makes early words
+# frequent and the generated tail terms rare.
+WORDS = (
+    "good great food fast delivery pizza cold hot late friendly tasty order again nice service "
+    "fresh burger price small big salad driver warm slow perfect bad recommend portion sauce"
+).split() + [f"term{i:04d}" for i in range(2000)]
+
+SEED_SQL = """
+INSERT INTO reviews (id, order_id, user_id, partner_id, rating, comment, created_at, updated_at)
+SELECT
+    gen_random_uuid(),
+    g,
+    'user-' || (g % 100000),
+    'partner-' || floor(:partners * power(random(), 2.0))::int,
+    1 + floor(random() * 5)::int,
+    concat_ws(' ', {words}),
+    ts,
+    ts
+FROM (
+    -- A per-row subquery: an uncorrelated LATERAL would be evaluated once for all rows.
+    SELECT g, timezone('utc', now()) - (random() * interval '365 days') AS ts
+    FROM generate_series(:start, :stop) AS g
+) AS s
+"""
+
+QUERIES = {
+    "common_word": {"q": "pizza"},
+    "two_words": {"q": "cold pizza"},
+    "phrase": {"q": '"fast delivery"'},
+    "rare_word": {"q": "term1500"},
+    "common_word_partner": {"q": "pizza", "partner_id": "partner-3"},
+    "common_word_low_ratings": {"q": "delivery", "max_rating": 2},
+}
+
+
+def _seed(reviews: int, partners: int, words_per_comment: int, chunk: int = 250_000) -> dict:
+    from app.database import engine, set_search_path
+    from app.migrations import provision_tenant
+
+    word = f"(:words)[1 + floor({len(WORDS)} * power(random(), 4.0))::int]"
+    insert = text(SEED_SQL.format(words=", ".join([word] * words_per_comment)))
+
+    provision_tenant(engine, SCHEMA)
+    timings = {}
+    with engine.connect() as conn:
+        set_search_path(conn, SCHEMA)
+        conn.execute(text("TRUNCATE TABLE reviews"))
+        # Bulk load without the GIN index, then time building it.
+        conn.execute(text("DROP INDEX IF EXISTS ix_reviews_comment_tsv"))
+        conn.commit()
+
+        started = time.perf_counter()
+        for start in range(1, reviews + 1, chunk):
+            stop = min(start + chunk - 1, reviews)
+            conn.execute(insert, {"start": start, "stop": stop, "partners": partners, "words": WORDS})
+            conn.commit()
+        timings["load_seconds"] = round(time.perf_counter() - started, 1)
+
+        started = time.perf_counter()
+        conn.execute(text("CREATE INDEX ix_reviews_comment_tsv ON reviews USING gin (comment_tsv)"))
+        conn.execute(text("ANALYZE reviews"))
+        conn.commit()
+        timings["gin_index_seconds"] = round(time.perf_counter() - started, 1)
+        timings["gin_index_mb"] = round(conn.execute(
+            text("SELECT pg_relation_size('ix_reviews_comment_tsv')")
+        ).scalar_one() / 2**20, 1)
+    return timings
+
+
+def _percentiles(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+    }
+
+
+def _time(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency of GET /reviews/search against ILIKE scans")
+    parser.add_argument("--reviews", type=int, default=5_000_000)
+    parser.add_argument("--partners", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=12, help="Words per comment")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--ilike-repeat", type=int, default=3)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = {"reviews": args.reviews}
+    if not args.skip_seed:
+        report["seed"] = _seed(args.reviews, args.partners, args.words)
+
+    from fastapi.testclient import TestClient
+
+    from app.database import get_db_session
+    from app.main import app
+
+    client = TestClient(app)
+    headers = {"x-tenant-id": SCHEMA}
+
+    def search(params, cursor=None):
+        r = client.get("/reviews/search", params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        r.raise_for_status()
+        return r
+
+    search_results = {}
+    for name, params in QUERIES.items():
+        first = search(params)
+        cursor = first.headers.get("X-Next-Cursor")
+        search_results[name] = {
+            "hits_on_first_page": len(first.json()),
+            "first_page": _percentiles(_time(lambda: search(params), args.repeat)),
+            **({"next_page": _percentiles(_time(lambda: search(params, cursor), args.repeat))} if cursor else {}),
+        }
+    report["search"] = search_results
+
+    with get_db_session(schema=SCHEMA) as db:
+        plan = db.execute(text(
+            "EXPLAIN SELECT id FROM reviews WHERE comment_tsv @@ websearch_to_tsquery('simple', 'term1500')"
+        )).scalars().all()
+        report["rare_word_plan_uses_gin"] = any("ix_reviews_comment_tsv" in line for line in plan)
+
+        # What support ran by hand before: a substring scan, newest first.
+        ilike = text(
+            "SELECT id FROM reviews WHERE comment ILIKE :pattern ORDER BY created_at DESC, id DESC LIMIT 50"
+        )
+        report["ilike"] = {
+            name: _percentiles(_time(lambda: db.execute(ilike, {"pattern": pattern}).all(), args.ilike_repeat))
+            for name, pattern in {"common_word": "%pizza%", "rare_word": "%term1500%"}.items()
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
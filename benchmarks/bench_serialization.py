@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import func, select
+
+from benchmarks import seed as seeding
+
+
+def _fetch_entities(db, partner_id: str, rows: int) -> list:
+    from app.models import Review
+
+    db.expunge_all()
+    return db.execute(
+        select(Review).where(Review.partner_id == partner_id).order_by(Review.created_at.desc()).limit(rows)
+    ).scalars().all()
+
+
+def _serialize_entities(reviews: list, field) -> bytes:
+    # The previous path: ORM entities validated through ReviewOut (from_attributes)
+    # by FastAPI's response_model handling, then rendered by JSONResponse.
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    return JSONResponse(asyncio.run(serialize_response(field=field, response_content=reviews))).body
+
+
+def _fetch_rows(db, partner_id: str, rows: int) -> list:
+    from app.models import Review
+    from app.schemas import ReviewOut
+
+    return db.execute(
+        select(*(getattr(Review, name) for name in ReviewOut.model_fields))
+        .where(Review.partner_id == partner_id)
+        .order_by(Review.created_at.desc())
+        .limit(rows)
+    ).all()
+
+
+def _serialize_rows(rows: list) -> bytes:
+    from app.schemas import ReviewOut
+    from app.serialization import REVIEW_ROWS, row_dicts
+
+    return REVIEW_ROWS.dump_json(row_dicts(ReviewOut.model_fields, rows))
+
+
+def _measure(fn, repeat: int) -> dict:
+    wall, cpu = [], []
+    for _ in range(repeat):
+        w, c = time.perf_counter(), time.process_time()
+        body = fn()
+        cpu.append(time.process_time() - c)
+        wall.append(time.perf_counter() - w)
+    return {"cpu_ms": round(min(cpu) * 1000, 2), "wall_ms": round(min(wall) * 1000, 2), "bytes": len(body)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU time to fetch and serialize a page of reviews")
+    seeding.add_arguments(parser)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.skip_seed:
+        seeding.seed(args.schema, args.reviews, args.partners, args.users, args.skew, args.comment_length)
+
+    from app.database import get_db_session
+    from app.main import app
+    from app.models import Review
+
+    field = next(r for r in app.routes if getattr(r, "path", None) == "/partners/{partner_id}/reviews").response_field
+
+    with get_db_session(schema=args.schema) as db:
+        partner_id, available = db.execute(
+            select(Review.partner_id, func.count()).group_by(Review.partner_id).order_by(func.count().desc()).limit(1)
+        ).one()
+        rows = min(args.rows, available)
+        entities, plain = _fetch_entities(db, partner_id, rows), _fetch_rows(db, partner_id, rows)
+        assert json.loads(_serialize_entities(entities, field)) == json.loads(_serialize_rows(plain))
+
+        results = {
+            "orm_response_model": {
+                "fetch_and_serialize": _measure(
+                    lambda: _serialize_entities(_fetch_entities(db, partner_id, rows), field), args.repeat
+                ),
+                "serialize_only": _measure(lambda: _serialize_entities(entities, field), args.repeat),
+            },
+            "core_type_adapter": {
+                "fetch_and_serialize": _measure(
+                    lambda: _serialize_rows(_fetch_rows(db, partner_id, rows)), args.repeat
+                ),
+                "serialize_only": _measure(lambda: _serialize_rows(plain), args.repeat),
+            },
+        }
+
+    per_10k = 10_000 / rows
+    print(json.dumps({
+        "rows": rows,
+        **results,
+        "cpu_ms_per_10k": {
+            path: {stage: round(m["cpu_ms"] * per_10k, 2) for stage, m in stages.items()}
+            for path, stages in results.items()
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is worse; rps is handled separately.
+LOWER_IS_BETTER = ["p50_ms", "p95_ms", "p99_ms", "queries_per_request", "query_ms_per_request"]
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    if baseline.get("config") != current.get("config"):
+        print("warning: reports were produced with different configs", file=sys.stderr)
+
+    regressions = []
+    for name, base in sorted(baseline["endpoints"].items()):
+        cur = current["endpoints"].get(name)
+        if cur is None:
+            continue
+        for metric in LOWER_IS_BETTER:
+            before, after = base.get(metric), cur.get(metric)
+            if before and after is not None and after > before * (1 + threshold):
+                regressions.append(f"{name}.{metric}: {before} -> {after}")
+        if base.get("rps") and cur.get("rps", 0) < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}.rps: {base['rps']} -> {cur['rps']}")
+        if cur.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"{name}.errors: {base.get('errors', 0)} -> {cur['errors']}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark suite reports")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative change (default 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
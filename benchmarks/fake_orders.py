@@ -0,0 +1,58 @@
+import random
+import time
+from concurrent import futures
+
+import grpc
+
+from app.grpc import orders_pb2, orders_pb2_grpc
+
+
+class FakeOrdersService(orders_pb2_grpc.OrdersServiceServicer):
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        partners: int = 100,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_ms: float = 0.0,
+    ):
+        self.latency = latency_ms / 1000.0
+        self.partners = max(1, partners)
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow = slow_ms / 1000.0
+
+    def _delay(self, context) -> None:
+        # Injected faults: a share of calls stall (tail latency) or fail with UNAVAILABLE.
+        delay = self.latency
+        if self.slow_rate and random.random() < self.slow_rate:
+            delay += self.slow
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "injected failure")
+
+    def _order(self, order_id: int) -> orders_pb2.Order:
+        return orders_pb2.Order(
+            id=order_id,
+            user_id=f"user-{order_id % 1000}",
+            partner_id=f"partner-{order_id % self.partners}",
+            order_status="COMPLETED",
+            payment_status="PAID",
+        )
+
+    def GetOrderById(self, request, context):
+        self._delay(context)
+        return orders_pb2.GetOrderByIdResponse(order=self._order(request.order_id))
+
+    def GetOrdersByIds(self, request, context):
+        self._delay(context)
+        return orders_pb2.GetOrdersByIdsResponse(orders=[self._order(oid) for oid in request.order_ids])
+
+
+def serve(port: int = 0, latency_ms: float = 0.0, partners: int = 100, workers: int = 64, **faults):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    orders_pb2_grpc.add_OrdersServiceServicer_to_server(FakeOrdersService(latency_ms, partners, **faults), server)
+    bound = server.add_insecure_port(f"127.0.0.1:{port}")
+    server.start()
+    return server, bound
@@ -0,0 +1,95 @@
+import argparse
+import time
+
+from sqlalchemy import text
+
+# Rows are generated server-side. Partner ids follow a power-law: with
+# skew > 1 a few low-numbered partners receive most of the reviews.
+SEED_SQL = text("""
+INSERT INTO reviews (id, order_id, user_id, partner_id, rating, comment, created_at, updated_at)
+SELECT
+    gen_random_uuid(),
+    g,
+    'user-' || (g % :users),
+    'partner-' || floor(:partners * power(random(), :skew))::int,
+    1 + floor(random() * 5)::int,
+    CASE WHEN :comment_length > 0 THEN repeat('x', 1 + floor(random() * :comment_length)::int) END,
+    ts,
+    ts
+FROM (
+    -- A per-row subquery: an uncorrelated LATERAL would be evaluated once for all rows.
+    SELECT g, timezone('utc', now()) - (random() * interval '365 days') AS ts
+    FROM generate_series(:start, :stop) AS g
+) AS s
+""")
+
+
+def seed(
+    schema: str,
+    reviews: int,
+    partners: int = 1000,
+    users: int = 100_000,
+    skew: float = 2.0,
+    comment_length: int = 200,
+    chunk: int = 500_000,
+) -> dict:
+    # Imported lazily so callers can adjust the environment read by Settings first.
+    from app.database import engine, get_db_session, set_search_path
+    from app.migrations import provision_tenant
+    from app.models import Base
+    from app.ratings import rebuild_ratings
+    from app.trends import rebuild_rollups
+
+    started = time.perf_counter()
+    provision_tenant(engine, schema)
+    with engine.connect() as conn:
+        set_search_path(conn, schema)
+        tables = ", ".join(t.name for t in Base.metadata.sorted_tables)
+        conn.execute(text(f"TRUNCATE TABLE {tables}"))
+        for start in range(1, reviews + 1, chunk):
+            conn.execute(SEED_SQL, {
+                "start": start,
+                "stop": min(start + chunk - 1, reviews),
+                "users": users,
+                "partners": partners,
+                "skew": skew,
+                "comment_length": comment_length,
+            })
+            conn.commit()
+        conn.execute(text("ANALYZE reviews"))
+        conn.commit()
+
+    with get_db_session(schema=schema) as db:
+        rebuild_ratings(db)
+        rebuild_rollups(db)
+        db.commit()
+
+    return {
+        "schema": schema,
+        "reviews": reviews,
+        "partners": partners,
+        "users": users,
+        "skew": skew,
+        "comment_length": comment_length,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--schema", default="bench")
+    parser.add_argument("--reviews", type=int, default=10_000)
+    parser.add_argument("--partners", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--skew", type=float, default=2.0)
+    parser.add_argument("--comment-length", type=int, default=200)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a tenant schema with synthetic reviews")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    print(seed(args.schema, args.reviews, args.partners, args.users, args.skew, args.comment_length))
+
+
+if __name__ == "__main__":
+    main()
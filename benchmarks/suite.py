@@ -0,0 +1,258 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks import seed as seeding
+from benchmarks.fake_orders import serve
+
+SCHEMA_VERSION = 1
+
+
+class Scenario:
+    def __init__(self, name: str, build):
+        self.name = name
+        self.build = build
+
+
+def _hot_partner(rng: random.Random, partners: int, skew: float) -> str:
+    return f"partner-{int(partners * rng.random() ** skew)}"
+
+
+def scenarios(args, next_order) -> list[Scenario]:
+    rng = random.Random(args.random_seed)
+    hot = lambda: _hot_partner(rng, args.partners, args.skew)
+
+    def post_review():
+        return "POST", "/reviews", {"json": {"order_id": next(next_order), "user_id": "bench", "rating": rng.randint(1, 5)}}
+
+    def post_batch():
+        reviews = [
+            {"order_id": next(next_order), "user_id": "bench", "rating": rng.randint(1, 5)}
+            for _ in range(args.batch_size)
+        ]
+        return "POST", "/reviews:batch", {"json": {"reviews": reviews}}
+
+    # The seeded reviews span the last year.
+    trend_range = {"granularity": "week", "from": (date.today() - timedelta(days=364)).isoformat()}
+
+    def bulk_ratings():
+        ids = ",".join(hot() for _ in range(args.bulk_partners))
+        return "GET", "/partners/ratings", {"params": {"partner_ids": ids}}
+
+    return [
+        Scenario("root", lambda: ("GET", "/", {})),
+        Scenario("health", lambda: ("GET", "/health", {})),
+        Scenario("create_review", post_review),
+        Scenario("create_reviews_batch", post_batch),
+        Scenario("list_partner_reviews", lambda: ("GET", f"/partners/{hot()}/reviews", {})),
+        Scenario(
+            "list_partner_reviews_projection",
+            lambda: ("GET", f"/partners/{hot()}/reviews", {"params": {"fields": "rating,created_at"}}),
+        ),
+        Scenario("partner_rating", lambda: ("GET", f"/partners/{hot()}/rating", {})),
+        Scenario("partners_ratings", bulk_ratings),
+        Scenario("partner_rating_trend", lambda: ("GET", f"/partners/{hot()}/rating/trend", {"params": trend_range})),
+        Scenario("leaderboard", lambda: ("GET", "/partners/leaderboard", {"params": {"min_count": 5}})),
+        Scenario(
+            "leaderboard_decayed",
+            lambda: ("GET", "/partners/leaderboard", {"params": {"order": "decayed", "limit": 100}}),
+        ),
+        Scenario(
+            "export_partner",
+            lambda: ("GET", "/reviews/export", {"params": {"partner_id": f"partner-{args.partners - 1}"}}),
+        ),
+    ]
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self.seconds = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        with self._lock:
+            self.count += 1
+            self.seconds += elapsed
+
+    def snapshot(self) -> tuple[int, float]:
+        with self._lock:
+            return self.count, self.seconds
+
+
+def _percentile(sorted_values: list[float], q: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return round(sorted_values[index] * 1000, 3)
+
+
+async def _drive(client: httpx.AsyncClient, scenario: Scenario, concurrency: int, requests: int, headers: dict):
+    latencies: list[float] = []
+    errors = 0
+    remaining = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while next(remaining) < requests:
+            method, path, kwargs = scenario.build()
+            start = time.perf_counter()
+            try:
+                r = await client.request(method, path, headers=headers, **kwargs)
+                await r.aread()
+                ok = r.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _start_app(port: int):
+    import uvicorn
+
+    from app.main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+async def run_suite(args, counter: QueryCounter) -> dict:
+    headers = {"x-tenant-id": args.schema}
+    next_order = itertools.count(args.reviews + 1)
+    selected = set(args.endpoints.split(",")) if args.endpoints else None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=120.0) as client:
+        for scenario in scenarios(args, next_order):
+            if selected and scenario.name not in selected:
+                continue
+            await _drive(client, scenario, args.concurrency, args.warmup, headers)
+
+            queries_before, query_seconds_before = counter.snapshot()
+            latencies, errors, elapsed = await _drive(client, scenario, args.concurrency, args.requests, headers)
+            queries_after, query_seconds_after = counter.snapshot()
+
+            latencies.sort()
+            results[scenario.name] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "rps": round(len(latencies) / elapsed, 1),
+                "p50_ms": _percentile(latencies, 0.50),
+                "p95_ms": _percentile(latencies, 0.95),
+                "p99_ms": _percentile(latencies, 0.99),
+                "queries_per_request": round((queries_after - queries_before) / max(1, len(latencies)), 2),
+                "query_ms_per_request": round(
+                    (query_seconds_after - query_seconds_before) * 1000 / max(1, len(latencies)), 3
+                ),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive every endpoint at fixed concurrency and report JSON")
+    seeding.add_arguments(parser)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an already seeded schema")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests per endpoint")
+    parser.add_argument("--orders-latency-ms", type=float, default=2.0)
+    parser.add_argument("--orders-error-rate", type=float, default=0.0, help="Share of Orders calls failing UNAVAILABLE")
+    parser.add_argument("--orders-slow-rate", type=float, default=0.0, help="Share of Orders calls delayed further")
+    parser.add_argument("--orders-slow-ms", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--bulk-partners", type=int, default=50)
+    parser.add_argument("--endpoints", default="", help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file as well as stdout")
+    args = parser.parse_args(argv)
+
+    orders_server, orders_port = serve(
+        latency_ms=args.orders_latency_ms,
+        partners=args.partners,
+        error_rate=args.orders_error_rate,
+        slow_rate=args.orders_slow_rate,
+        slow_ms=args.orders_slow_ms,
+    )
+    # Settings are read on import, so the Orders address must be set first.
+    os.environ["ORDERS_GRPC_HOST"] = "127.0.0.1"
+    os.environ["ORDERS_GRPC_PORT"] = str(orders_port)
+
+    seed_info = None
+    if not args.skip_seed:
+        seed_info = seeding.seed(args.schema, args.reviews, args.partners, args.users, args.skew, args.comment_length)
+
+    from app.database import engine
+    from app.migrations import migrate_schema
+
+    migrate_schema(engine, "public")
+    counter = QueryCounter(engine)
+    server, thread = _start_app(args.port)
+    try:
+        endpoints = asyncio.run(run_suite(args, counter))
+    finally:
+        server.should_exit = True
+        thread.join()
+        orders_server.stop(None)
+
+    report = {
+        "schema_version": SCHEMA_VERSION,
+        "git_revision": _git_revision(),
+        "config": {
+            "reviews": args.reviews,
+            "partners": args.partners,
+            "skew": args.skew,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "orders_latency_ms": args.orders_latency_ms,
+            "batch_size": args.batch_size,
+            "bulk_partners": args.bulk_partners,
+        },
+        "seed": seed_info,
+        "endpoints": endpoints,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,7 +23,12 @@ def _stub_orders_grpc_modules():
         def __init__(self, order_id: int):
             self.order_id = order_id
 
+    class GetOrdersByIdsRequest:
+        def __init__(self, order_ids):
+            self.order_ids = list(order_ids)
+
     orders_pb2.GetOrderByIdRequest = GetOrderByIdRequest
+    orders_pb2.GetOrdersByIdsRequest = GetOrdersByIdsRequest
     sys.modules.setdefault("orders_pb2", orders_pb2)
     sys.modules.setdefault("app.grpc.orders_pb2", orders_pb2)
 
@@ -36,6 +41,9 @@ def _stub_orders_grpc_modules():
         def GetOrderById(self, request, metadata=None):
             raise RuntimeError("Stub called. Tests must monkeypatch app.main.get_order_by_id.")
 
+        def GetOrdersByIds(self, request, metadata=None):
+            raise RuntimeError("Stub called. Tests must monkeypatch app.main.get_orders_by_ids.")
+
     orders_pb2_grpc.OrdersServiceStub = OrdersServiceStub
     sys.modules.setdefault("orders_pb2_grpc", orders_pb2_grpc)
     sys.modules.setdefault("app.grpc.orders_pb2_grpc", orders_pb2_grpc)
@@ -54,16 +62,10 @@ def app_and_engine():
     app.include_router(main_mod.router)
 
     from app.database import engine
-    from app.models import Base
-    from sqlalchemy import text
-
-    schemas = ["public", "tenant_a", "tenant_b"]
+    from app.migrations import provision_tenant
 
-    with engine.begin() as conn:
-        for schema in schemas:
-            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
-            conn.execute(text(f"SET search_path TO {schema}"))
-            Base.metadata.create_all(bind=conn)
+    for schema in ["public", "tenant_a", "tenant_b"]:
+        provision_tenant(engine, schema)
 
     return app, engine
 
@@ -78,12 +80,21 @@ def client(app_and_engine):
 @pytest.fixture(autouse=True)
 def _clean_db(app_and_engine):
     _, engine = app_and_engine
+    from app.models import Base
+    from app.orders import order_cache
+    from app.ratings import rating_cache
     schemas = ["public", "tenant_a", "tenant_b"]
+    rating_cache.clear()
+    order_cache.clear()
+
+    from app.database import set_search_path
 
-    with engine.begin() as conn:
+    with engine.connect() as conn:
         for schema in schemas:
-            conn.execute(text(f"SET search_path TO {schema}"))
-            conn.execute(text("TRUNCATE TABLE reviews RESTART IDENTITY CASCADE"))
+            set_search_path(conn, schema)
+            tables = ", ".join(t.name for t in Base.metadata.sorted_tables)
+            conn.execute(text(f"TRUNCATE TABLE {tables} RESTART IDENTITY CASCADE"))
+            conn.commit()
 
 
 class FakeOrder:
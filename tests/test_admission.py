@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app import admission as admission_module
+from app.admission import AdmissionController, Rejected
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    from app.tenants import tenant_registry
+
+    # Done by the startup hook when admission control is enabled.
+    tenant_registry.schemas()
+
+    def install(**kwargs):
+        controller = AdmissionController(**kwargs)
+        monkeypatch.setattr(admission_module, "admission", controller)
+        return controller
+
+    return install
+
+
+def test_tenant_rate_limit_sheds_only_the_noisy_tenant(client, limits):
+    clock = FakeClock()
+    limits(tenant_rate=1.0, tenant_burst=2, clock=clock)
+
+    assert client.get("/partners/p1/rating").status_code == 200
+    assert client.get("/partners/p1/rating").status_code == 200
+    r = client.get("/partners/p1/rating")
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "1"
+
+    # Other tenants and health checks are not affected.
+    assert client.get("/partners/p1/rating", headers={"x-tenant-id": "other"}).status_code != 429
+    assert client.get("/health").status_code == 200
+
+    clock.now += 1
+    assert client.get("/partners/p1/rating").status_code == 200
+
+
+def test_ids_without_a_schema_share_one_bucket(client, limits):
+    controller = limits(tenant_rate=1.0, tenant_burst=1, clock=FakeClock())
+
+    assert client.get("/partners/p1/rating", headers={"x-tenant-id": "Bad-Id!"}).status_code == 400
+    assert client.get("/partners/p1/rating", headers={"x-tenant-id": "ghost_a"}).status_code == 404
+    assert client.get("/partners/p1/rating", headers={"x-tenant-id": "ghost_b"}).status_code == 429
+    assert client.get("/partners/p1/rating").status_code == 200
+    assert set(controller._tenants) == {"", "public"}
+
+
+def test_global_limit_queues_briefly_then_sheds():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.05)
+        await controller.acquire("a")
+
+        waiting = asyncio.ensure_future(controller.acquire("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as overflow:
+            await controller.acquire("c")
+        assert overflow.value.status_code == 503
+
+        controller.release("a")
+        await waiting
+        controller.release("b")
+
+        await controller.acquire("a")
+        with pytest.raises(Rejected) as timed_out:
+            await controller.acquire("b")
+        assert timed_out.value.reason == "queue_timeout"
+        controller.release("a")
+        assert controller._in_flight == 0 and not controller._waiters
+
+    asyncio.run(scenario())
+
+
+def test_slot_handed_over_as_the_wait_times_out_is_released(monkeypatch):
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1.0)
+
+    async def handoff_then_timeout(waiter, timeout):
+        # The holder releases in the same tick the timeout fires.
+        controller.release("a")
+        assert waiter.done()
+        raise asyncio.TimeoutError()
+
+    async def scenario():
+        await controller.acquire("a")
+        monkeypatch.setattr(admission_module.asyncio, "wait_for", handoff_then_timeout)
+        with pytest.raises(Rejected) as rejected:
+            await controller.acquire("b")
+        assert rejected.value.reason == "queue_timeout"
+        monkeypatch.undo()
+
+        assert controller._in_flight == 0
+        await controller.acquire("c")
+        controller.release("c")
+
+    asyncio.run(scenario())
+
+
+def test_tenant_in_flight_limit():
+    async def scenario():
+        controller = AdmissionController(tenant_max_in_flight=2)
+        await controller.acquire("a")
+        await controller.acquire("a")
+        with pytest.raises(Rejected) as rejected:
+            await controller.acquire("a")
+        assert (rejected.value.status_code, rejected.value.reason) == (429, "tenant_concurrency")
+        await controller.acquire("b")
+
+        controller.release("a")
+        await controller.acquire("a")
+
+    asyncio.run(scenario())
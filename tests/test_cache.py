@@ -0,0 +1,40 @@
+from app.cache import MISSING, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache("test_ttl", maxsize=10, ttl=5, clock=clock)
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    clock.now = 5.0
+    assert cache.get("a") is MISSING
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache("test_lru", maxsize=2, ttl=60, clock=FakeClock())
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    found, missing = cache.get_many(["a", "b", "c"])
+    assert found == {"a": 1, "c": 3}
+    assert missing == ["b"]
+
+
+def test_ttl_cache_disabled_when_size_zero():
+    cache = TTLCache("test_disabled", maxsize=0, ttl=60)
+
+    cache.set("a", 1)
+    assert cache.get("a") is MISSING
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+
+from tests.conftest import FakeOrder, FakeResp
+
+
+def _seed(client, monkeypatch):
+    import app.main as main_mod
+
+    monkeypatch.setattr(
+        main_mod,
+        "get_order_by_id",
+        lambda order_id, tenant_id=None: FakeResp(FakeOrder(user_id="user-1", partner_id=f"p{order_id % 2}")),
+    )
+    for order_id in range(100, 104):
+        r = client.post("/reviews", json={"order_id": order_id, "user_id": "user-1", "rating": 4, "comment": "a,b"})
+        assert r.status_code == 201
+
+
+def test_export_ndjson_filtered_by_partner(client, monkeypatch):
+    _seed(client, monkeypatch)
+
+    r = client.get("/reviews/export", params={"partner_id": "p0"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["order_id"] for row in rows] == [100, 102]
+    assert all(row["partner_id"] == "p0" for row in rows)
+
+
+def test_export_csv_gzip(client, monkeypatch):
+    _seed(client, monkeypatch)
+
+    r = client.get("/reviews/export", params={"format": "csv", "gzip": "true"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == 4
+    assert rows[0]["comment"] == "a,b"
+
+
+def test_export_is_tenant_scoped(client, monkeypatch):
+    _seed(client, monkeypatch)
+
+    r = client.get("/reviews/export", headers={"x-tenant-id": "tenant_a"})
+    assert r.status_code == 200
+    assert r.text == ""
@@ -1,4 +1,5 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 
 
 def test_health_ok(client):
@@ -10,7 +11,7 @@ def test_health_ok(client):
 
 def test_health_db_failure_returns_503(app_and_engine):
     app, _ = app_and_engine
-    from app.main import get_db_with_schema
+    from app.main import get_read_db_with_schema
 
     def _bad_db():
         class Bad:
@@ -18,7 +19,7 @@ def test_health_db_failure_returns_503(app_and_engine):
                 raise Exception("db down")
         yield Bad()
 
-    app.dependency_overrides[get_db_with_schema] = _bad_db
+    app.dependency_overrides[get_read_db_with_schema] = _bad_db
     client = TestClient(app)
 
     r = client.get("/health")
@@ -26,3 +27,23 @@ def test_health_db_failure_returns_503(app_and_engine):
     assert "Database unavailable" in r.json()["detail"]
 
     app.dependency_overrides.clear()
+
+
+def test_search_path_skipped_when_connection_already_on_schema(app_and_engine):
+    from sqlalchemy import event
+    from app.database import engine, get_db_session
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        for _ in range(3):
+            with get_db_session(schema="tenant_a") as db:
+                db.execute(text("SELECT 1"))
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert sum("search_path" in s for s in statements) <= 1
@@ -0,0 +1,110 @@
+import itertools
+from datetime import datetime, timedelta
+
+from app.models import Review
+
+_order_ids = itertools.count(1000)
+
+
+def _add_reviews(reviews):
+    from app.database import get_db_session
+    from app.reviews import insert_reviews
+
+    rows = [
+        {"id": Review.new_id(), "order_id": next(_order_ids), "user_id": "user-1", "partner_id": partner_id, "rating": rating}
+        for partner_id, rating in reviews
+    ]
+    with get_db_session(schema="public") as db:
+        insert_reviews(db, rows)
+        db.commit()
+
+
+def _ranking(client, **params):
+    return [entry["partner_id"] for entry in client.get("/partners/leaderboard", params=params).json()]
+
+
+def test_bayesian_prior_outranks_small_samples(client):
+    from app.cli import main as cli_main
+
+    _add_reviews([("p-one", 5)] + [("p-many", 4)] * 20 + [("p-low", 2)] * 10)
+
+    # The first write seeds the prior from the tenant's totals.
+    assert _ranking(client) == ["p-many", "p-one", "p-low"]
+
+    # Later writes score against the same prior until it is refreshed.
+    _add_reviews([("p-new", 5)])
+    board = {e["partner_id"]: e for e in client.get("/partners/leaderboard").json()}
+    prior_mean = (5 + 4 * 20 + 2 * 10) / 31
+    assert abs(board["p-new"]["score"] - (10 * prior_mean + 5) / 11) < 1e-9
+
+    assert cli_main(["refresh-leaderboard", "--schema", "public"]) == 0
+    board = {e["partner_id"]: e for e in client.get("/partners/leaderboard").json()}
+    prior_mean = (5 + 4 * 20 + 2 * 10 + 5) / 32
+    assert abs(board["p-new"]["score"] - (10 * prior_mean + 5) / 11) < 1e-9
+    assert board["p-new"]["avg_rating"] == 5.0
+    assert board["p-new"]["count"] == 1
+
+    assert _ranking(client, min_count=10) == ["p-many", "p-low"]
+
+
+def test_leaderboard_keyset_pagination(client):
+    _add_reviews([(f"p-{i:02d}", 1 + i % 5) for i in range(12)])
+    expected = _ranking(client, limit=500)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/partners/leaderboard", params=params)
+        seen += [e["partner_id"] for e in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == expected
+    assert len(seen) == 12
+    assert client.get("/partners/leaderboard", params={"cursor": "nope"}).status_code == 400
+
+
+def test_decayed_order_prefers_recent_reviews(client, app_and_engine):
+    from sqlalchemy import text
+    from app.database import get_db_session
+    from app.ratings import rebuild_ratings
+
+    _add_reviews([("p-faded", 5)] * 5 + [("p-faded", 1)] * 5 + [("p-steady", 3)] * 10)
+    _, engine = app_and_engine
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE public.reviews SET created_at = :old WHERE partner_id = 'p-faded' AND rating = 5"),
+            {"old": datetime.utcnow() - timedelta(days=730)},
+        )
+    with get_db_session(schema="public") as db:
+        rebuild_ratings(db)
+        db.commit()
+
+    assert _ranking(client, order="decayed") == ["p-steady", "p-faded"]
+    bayes = {e["partner_id"]: e["score"] for e in client.get("/partners/leaderboard").json()}
+    assert abs(bayes["p-faded"] - bayes["p-steady"]) < 1e-9
+
+
+def test_short_half_life_rebases_decay_weights(client, app_and_engine, monkeypatch):
+    from sqlalchemy import text
+    from app.cli import main as cli_main
+    from app.config import settings
+
+    # 2024-01-01 is more than 709 one-day half-lives ago, past exp's range.
+    monkeypatch.setattr(settings, "leaderboard_half_life_days", 1.0)
+    _, engine = app_and_engine
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO public.leaderboard_prior (id, mean, weight, decay_epoch) VALUES (1, 3, 10, 1704067200)"
+        ))
+    assert cli_main(["refresh-leaderboard", "--schema", "public"]) == 0
+
+    _add_reviews([("p-a", 5)] * 3 + [("p-b", 2)] * 3)
+    assert _ranking(client, order="decayed") == ["p-a", "p-b"]
+
+    assert cli_main(["refresh-leaderboard", "--schema", "public"]) == 0
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT decay_count FROM public.partner_ratings WHERE partner_id = 'p-a'")).scalar_one()
+    assert 2.9 < count <= 3.0
+    assert _ranking(client, order="decayed") == ["p-a", "p-b"]
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import text
+
+LEGACY_DDL = [
+    """
+    CREATE TABLE reviews (
+        id VARCHAR(36) NOT NULL PRIMARY KEY,
+        order_id INTEGER NOT NULL,
+        user_id VARCHAR(36) NOT NULL,
+        partner_id VARCHAR(36) NOT NULL,
+        rating INTEGER NOT NULL,
+        comment TEXT,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        CONSTRAINT uq_reviews_order_id UNIQUE (order_id)
+    )
+    """,
+    "CREATE UNIQUE INDEX ix_reviews_id ON reviews (id)",
+    "CREATE INDEX ix_reviews_order_id ON reviews (order_id)",
+    "CREATE INDEX ix_reviews_user_id ON reviews (user_id)",
+    "CREATE INDEX ix_reviews_partner_id ON reviews (partner_id)",
+    """
+    INSERT INTO reviews VALUES (
+        '0b7e6f9e-8a51-4c1e-9a57-0d3c2f1f6a10', 1, 'user-1', 'p1', 5, NULL, now(), now()
+    )
+    """,
+]
+
+
+def _drop_schema(engine, schema):
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.commit()
+
+
+def test_migrate_converts_legacy_schema(app_and_engine):
+    from app.database import set_search_path
+    from app.migrations import LATEST_VERSION, migrate_schema, schema_version
+
+    _, engine = app_and_engine
+
+    _drop_schema(engine, "legacy_tenant")
+    with engine.connect() as conn:
+        conn.execute(text("CREATE SCHEMA legacy_tenant"))
+        conn.commit()
+        set_search_path(conn, "legacy_tenant")
+        for statement in LEGACY_DDL:
+            conn.execute(text(statement))
+        conn.commit()
+
+    assert schema_version(engine, "legacy_tenant") == 0
+    assert migrate_schema(engine, "legacy_tenant") == list(range(1, LATEST_VERSION + 1))
+    assert migrate_schema(engine, "legacy_tenant") == []
+    assert schema_version(engine, "legacy_tenant") == LATEST_VERSION
+
+    with engine.connect() as conn:
+        id_type = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = 'legacy_tenant' AND table_name = 'reviews' AND column_name = 'id'"
+        )).scalar_one()
+        indexes = set(conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE schemaname = 'legacy_tenant' AND tablename = 'reviews'"
+        )).scalars())
+        rows = conn.execute(text("SELECT count(*) FROM legacy_tenant.reviews")).scalar_one()
+        order_id_index = conn.execute(text(
+            "SELECT pg_get_indexdef(conindid) FROM pg_constraint "
+            "WHERE conname = 'uq_reviews_order_id' AND connamespace = 'legacy_tenant'::regnamespace"
+        )).scalar_one()
+    _drop_schema(engine, "legacy_tenant")
+
+    assert id_type == "uuid"
+    assert rows == 1
+    assert order_id_index.endswith("(order_id) INCLUDE (id)")
+    assert "ix_reviews_id" not in indexes
+    assert "ix_reviews_order_id" not in indexes
+    assert "ix_reviews_partner_id" not in indexes
+    assert {
+        "ix_reviews_partner_created_id", "uq_reviews_idempotency_key", "ix_reviews_user_id", "ix_reviews_comment_tsv"
+    } <= indexes
+
+
+def test_provision_tenant_cli(client, app_and_engine, capsys):
+    from app.cli import main
+    from app.migrations import LATEST_VERSION, SchemaVersionError, schema_version, verify_schema_version
+
+    _, engine = app_and_engine
+    _drop_schema(engine, "tenant_new")
+
+    assert main(["provision-tenant", "tenant_new"]) == 0
+    assert schema_version(engine, "tenant_new") == LATEST_VERSION
+    r = client.get("/health", headers={"X-Tenant-ID": "tenant_new"})
+    assert r.status_code == 200
+
+    assert main(["migrate", "--schema", "tenant_new", "--schema", "tenant_a"]) == 0
+    out = capsys.readouterr().out
+    assert "tenant_new: up to date" in out
+    assert "tenant_a: up to date" in out
+
+    _drop_schema(engine, "tenant_new")
+    with pytest.raises(SchemaVersionError):
+        verify_schema_version(engine, "tenant_new")
+    assert main(["provision-tenant", "Bad-Name"]) == 2
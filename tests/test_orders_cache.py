@@ -0,0 +1,96 @@
+import threading
+import time
+
+from app.orders import OrderInfo, lookup_order
+from tests.conftest import FakeOrder, FakeResp
+
+
+def test_create_review_reuses_cached_order_lookup(client, monkeypatch):
+    import app.main as main_mod
+
+    calls = []
+
+    def _fake(order_id, tenant_id=None):
+        calls.append((tenant_id, order_id))
+        return FakeResp(FakeOrder(user_id="user-1", partner_id=None, has_partner_field=False))
+
+    monkeypatch.setattr(main_mod, "get_order_by_id", _fake)
+
+    payload = {"order_id": 110, "user_id": "user-1", "rating": 5}
+    assert client.post("/reviews", json=payload).status_code == 400
+    assert client.post("/reviews", json=payload).status_code == 400
+    assert client.post("/reviews", json=payload, headers={"x-tenant-id": "tenant_a"}).status_code == 400
+
+    assert calls == [("public", 110), ("tenant_a", 110)]
+
+
+def test_lookup_order_caches_not_found():
+    calls = []
+
+    class _NoOrder:
+        def HasField(self, name):
+            return False
+
+    def _fetch(order_id, tenant_id=None):
+        calls.append(order_id)
+        return _NoOrder()
+
+    assert lookup_order(_fetch, 111, "public") is None
+    assert lookup_order(_fetch, 111, "public") is None
+    assert calls == [111]
+
+
+def test_lookup_order_single_flight():
+    calls = []
+    release = threading.Event()
+
+    def _fetch(order_id, tenant_id=None):
+        calls.append(order_id)
+        release.wait(5)
+        return FakeResp(FakeOrder(user_id="user-1", partner_id="p-sf"))
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(lookup_order(_fetch, 112, "public")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [112]
+    assert results == [OrderInfo(partner_id="p-sf", user_id="user-1")] * 5
+
+
+def test_async_lookup_survives_leader_cancellation():
+    import asyncio
+
+    from app.orders import lookup_order_async
+
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def _fetch(order_id, tenant_id=None):
+            calls.append(order_id)
+            await release.wait()
+            return FakeResp(FakeOrder(user_id="user-1", partner_id="p-async"))
+
+        leader = asyncio.ensure_future(lookup_order_async(_fetch, 113, "public"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(lookup_order_async(_fetch, 113, "public"))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == OrderInfo(partner_id="p-async", user_id="user-1")
+        assert leader.cancelled()
+
+    asyncio.run(scenario())
+    assert calls == [113]
@@ -0,0 +1,34 @@
+from app.grpc.channels import ChannelManager, ChannelPool
+
+
+class FakeChannel:
+    def __init__(self, target, options=None):
+        self.target = target
+        self.options = options
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_channel_pool_reuses_and_round_robins():
+    pool = ChannelPool("orders:50051", size=2, factory=FakeChannel)
+
+    first = [pool.get() for _ in range(4)]
+
+    assert len({id(c) for c in first}) == 2
+    assert first[0] is first[2]
+    assert first[1] is first[3]
+
+
+def test_channel_manager_shares_pool_per_target_and_closes():
+    manager = ChannelManager(size=1, options=[("grpc.keepalive_time_ms", 1000)], factory=FakeChannel)
+
+    a = manager.channel("a:1")
+    assert manager.channel("a:1") is a
+    assert manager.channel("b:1") is not a
+    assert a.options == [("grpc.keepalive_time_ms", 1000)]
+
+    manager.close()
+    assert a.closed
+    assert manager.channel("a:1") is not a
@@ -0,0 +1,77 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.replica import RYW_COOKIE, ReplicaRouter
+
+
+def _routes(target, reason):
+    return REGISTRY.get_sample_value("db_read_routes_total", {"target": target, "reason": reason}) or 0.0
+
+
+@pytest.fixture()
+def replica(app_and_engine, monkeypatch):
+    # A second engine on the same database stands in for a streaming replica.
+    import app.main as main_mod
+    from app.database import DATABASE_URL
+
+    _, primary = app_and_engine
+    replica_engine = create_engine(DATABASE_URL)
+    router = ReplicaRouter(primary, replica_engine, max_lag=5, check_interval=0)
+    monkeypatch.setattr(main_mod, "replica_router", router)
+    yield router
+    replica_engine.dispose()
+
+
+def test_reads_route_to_replica_and_writes_stick_to_primary(client, replica, mock_order_ok):
+    before = _routes("replica", "ok")
+    assert client.get("/partners/partner-1/reviews").status_code == 200
+    assert client.get("/partners/partner-1/rating").status_code == 200
+    assert _routes("replica", "ok") == before + 2
+
+    r = client.post("/reviews", json={"order_id": 1, "user_id": "user-1", "rating": 4})
+    assert r.status_code == 201
+    assert RYW_COOKIE in r.cookies
+
+    sticky = _routes("primary", "read_your_writes")
+    assert len(client.get("/partners/partner-1/reviews").json()) == 1
+    assert _routes("primary", "read_your_writes") == sticky + 1
+
+
+def test_falls_back_to_primary_when_replica_is_down(client, replica):
+    replica.replica = create_engine("postgresql://nobody@127.0.0.1:1/none", connect_args={"connect_timeout": 1})
+
+    before = _routes("primary", "replica_down")
+    assert client.get("/health").status_code == 200
+    assert client.get("/partners/ratings", params={"partner_ids": "partner-1"}).status_code == 200
+    assert _routes("primary", "replica_down") == before + 2
+
+
+def test_falls_back_to_primary_when_replica_lags(client, replica, monkeypatch):
+    import app.replica as replica_mod
+
+    monkeypatch.setattr(replica_mod, "LAG_SQL", text("SELECT 30.0"))
+    before = _routes("primary", "replica_lagging")
+    assert client.get("/partners/leaderboard").status_code == 200
+    assert _routes("primary", "replica_lagging") == before + 1
+    assert REGISTRY.get_sample_value("db_replica_usable") == 0
+
+    monkeypatch.setattr(replica_mod, "LAG_SQL", text("SELECT 0.5"))
+    assert client.get("/partners/leaderboard").status_code == 200
+    assert REGISTRY.get_sample_value("db_replica_usable") == 1
+
+
+def test_rating_cache_is_filled_from_primary_reads_only(client, replica, mock_order_ok):
+    from app.cache import MISSING
+    from app.ratings import rating_cache, to_cached_rating
+
+    key = ("public", "partner-1")
+    assert client.get("/partners/ratings?partner_ids=partner-1").json()["partner-1"]["count"] == 0
+    assert rating_cache.get(key) is MISSING
+
+    assert client.post("/reviews", json={"order_id": 1, "user_id": "user-1", "rating": 4}).status_code == 201
+    # An entry cached before the write, as another process would still hold it.
+    rating_cache.set(key, to_cached_rating("partner-1", None))
+
+    assert client.get("/partners/ratings?partner_ids=partner-1").json()["partner-1"]["count"] == 1
+    assert rating_cache.get(key).body.count == 1
@@ -0,0 +1,79 @@
+import json
+
+from tests.conftest import FakeOrder, FakeResp
+
+SCHEMAS = ["public", "tenant_a", "tenant_b"]
+
+
+def _seed(client, monkeypatch):
+    import app.main as main_mod
+
+    monkeypatch.setattr(
+        main_mod,
+        "get_order_by_id",
+        lambda order_id, tenant_id=None: FakeResp(FakeOrder(user_id="user-1", partner_id=f"p{order_id % 2}")),
+    )
+    ratings = {"public": [5, 4, 3], "tenant_a": [1, 5], "tenant_b": [2]}
+    for tenant, values in ratings.items():
+        for order_id, rating in enumerate(values, start=1):
+            r = client.post(
+                "/reviews",
+                json={"order_id": order_id, "user_id": "user-1", "rating": rating},
+                headers={"x-tenant-id": tenant},
+            )
+            assert r.status_code == 201
+
+
+def _records(body: bytes) -> list[dict]:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_report_merges_every_tenant(client, monkeypatch):
+    _seed(client, monkeypatch)
+
+    r = client.get("/reports/ratings", params={"tenants": ",".join(SCHEMAS), "concurrency": 2})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    records = _records(r.content)
+
+    partners = {(rec["tenant"], rec["partner_id"]): rec for rec in records if rec["type"] == "partner"}
+    assert partners[("public", "p1")]["count"] == 2
+    assert partners[("public", "p1")]["avg_rating"] == 4.0
+    assert partners[("tenant_a", "p0")]["distribution"] == {"1": 0, "2": 0, "3": 0, "4": 0, "5": 1}
+
+    tenants = {rec["tenant"]: rec for rec in records if rec["type"] == "tenant"}
+    assert set(tenants) == set(SCHEMAS)
+    assert tenants["tenant_a"]["partners"] == 2
+    assert tenants["tenant_a"]["avg_rating"] == 3.0
+
+    assert records[-1] == {
+        "type": "total",
+        "tenants": 3,
+        "failed": [],
+        "avg_rating": round(20 / 6, 4),
+        "count": 6,
+        "distribution": {"1": 1, "2": 1, "3": 1, "4": 1, "5": 2},
+    }
+
+    assert client.get("/reports/ratings", params={"tenants": "tenant_zz"}).status_code == 404
+
+
+def test_report_cli_writes_ndjson_and_reports_progress(client, monkeypatch, tmp_path, capsys):
+    from app.cli import main
+
+    _seed(client, monkeypatch)
+    output = tmp_path / "report.ndjson"
+    args = ["ratings-report", "--concurrency", "3", "--output", str(output)]
+    assert main(args + [arg for schema in SCHEMAS for arg in ("--schema", schema)]) == 0
+
+    records = _records(output.read_bytes())
+    assert records[-1]["count"] == 6
+    progress = capsys.readouterr().err.splitlines()
+    assert len(progress) == 3
+    assert all(line.startswith(f"[{i}/3] ") for i, line in enumerate(progress, start=1))
+
+    # A schema without the tables fails on its own; the rest of the report still completes.
+    assert main(args + ["--schema", "tenant_a", "--schema", "information_schema"]) == 1
+    records = _records(output.read_bytes())
+    assert records[-1]["tenants"] == 1
+    assert records[-1]["failed"] == ["information_schema"]
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+from concurrent import futures
+
+import grpc
+import pytest
+
+from app.grpc.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, ResilientCaller
+
+METHOD = "/test.Flaky/Call"
+
+
+class FlakyServer:
+    # Each call pops the next (delay_seconds, status_code or None) from the script.
+    def __init__(self):
+        self.script = []
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+        handler = grpc.method_handlers_generic_handler(
+            "test.Flaky", {"Call": grpc.unary_unary_rpc_method_handler(self._call)}
+        )
+        self.server.add_generic_rpc_handlers((handler,))
+        self.port = self.server.add_insecure_port("127.0.0.1:0")
+        self.server.start()
+
+    def _call(self, request, context):
+        with self._lock:
+            self.calls += 1
+            delay, code = self.script.pop(0) if self.script else (0, None)
+        time.sleep(delay)
+        if code is not None:
+            context.abort(code, "injected")
+        return request
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope="module")
+def flaky():
+    server = FlakyServer()
+    channel = grpc.insecure_channel(f"127.0.0.1:{server.port}")
+    yield server, channel.unary_unary(METHOD)
+    channel.close()
+    server.server.stop(None)
+
+
+@pytest.fixture(autouse=True)
+def _reset(flaky):
+    server, _ = flaky
+    server.script, server.calls = [], 0
+
+
+def _caller(**kwargs):
+    breaker = kwargs.pop("breaker", None) or CircuitBreaker("flaky", failure_threshold=3, reset_timeout=10)
+    return ResilientCaller("flaky", breaker, **{"deadline": 1.0, "initial_backoff": 0.01, **kwargs})
+
+
+def test_deadline_bounds_a_hung_call(flaky):
+    server, fn = flaky
+    server.script = [(2.0, None)]
+
+    started = time.monotonic()
+    with pytest.raises(grpc.RpcError) as exc:
+        _caller(deadline=0.2).call("Call", fn, b"x")
+    assert exc.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert time.monotonic() - started < 1.0
+
+
+def test_retries_unavailable_but_not_other_codes(flaky):
+    server, fn = flaky
+    server.script = [(0, grpc.StatusCode.UNAVAILABLE), (0, grpc.StatusCode.UNAVAILABLE)]
+    assert _caller(max_attempts=3).call("Call", fn, b"ok") == b"ok"
+    assert server.calls == 3
+
+    server.script, server.calls = [(0, grpc.StatusCode.NOT_FOUND)], 0
+    with pytest.raises(grpc.RpcError) as exc:
+        _caller(max_attempts=3).call("Call", fn, b"ok")
+    assert exc.value.code() == grpc.StatusCode.NOT_FOUND
+    assert server.calls == 1
+
+
+def test_breaker_opens_fails_fast_and_recovers(flaky):
+    server, fn = flaky
+    clock = FakeClock()
+    breaker = CircuitBreaker("flaky", failure_threshold=2, reset_timeout=5, clock=clock)
+    caller = _caller(breaker=breaker, max_attempts=1)
+
+    server.script = [(0, grpc.StatusCode.UNAVAILABLE)] * 2
+    for _ in range(2):
+        with pytest.raises(grpc.RpcError):
+            caller.call("Call", fn, b"x")
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpen) as exc:
+        caller.call("Call", fn, b"x")
+    assert exc.value.retry_after == 5
+    assert server.calls == 2
+
+    clock.now = 6
+    assert breaker.state == HALF_OPEN
+    assert caller.call("Call", fn, b"probe") == b"probe"
+    assert breaker.state == CLOSED
+
+
+def test_hedged_request_cuts_tail_latency(flaky):
+    server, fn = flaky
+    server.script = [(1.0, None), (0, None)]
+
+    started = time.monotonic()
+    assert _caller(hedge_delay=0.05, deadline=2.0).call("Call", fn, b"fast") == b"fast"
+    assert time.monotonic() - started < 0.5
+    assert server.calls == 2
+
+
+def test_async_retry_and_hedge(flaky):
+    server, _ = flaky
+
+    async def run():
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{server.port}") as channel:
+            fn = channel.unary_unary(METHOD)
+            server.script = [(0, grpc.StatusCode.UNAVAILABLE)]
+            assert await _caller().acall("Call", fn, b"retried") == b"retried"
+            server.script = [(1.0, None), (0, None)]
+            started = time.monotonic()
+            assert await _caller(hedge_delay=0.05, deadline=2.0).acall("Call", fn, b"hedged") == b"hedged"
+            return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.5
+
+
+def test_open_circuit_returns_503(client, monkeypatch):
+    import app.main as main_mod
+
+    def _open(*args, **kwargs):
+        raise CircuitOpen("orders", retry_after=2.5)
+
+    monkeypatch.setattr(main_mod, "get_order_by_id", _open)
+
+    r = client.post("/reviews", json={"order_id": 900, "user_id": "user-1", "rating": 5})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "3"
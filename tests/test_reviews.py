@@ -101,7 +101,12 @@ def test_list_partner_reviews_sorted_desc(client, monkeypatch):
 def test_get_partner_rating_zero_when_none(client):
     r = client.get("/partners/p0/rating")
     assert r.status_code == 200
-    assert r.json() == {"partner_id": "p0", "avg_rating": 0.0, "count": 0}
+    assert r.json() == {
+        "partner_id": "p0",
+        "avg_rating": 0.0,
+        "count": 0,
+        "distribution": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0},
+    }
 
 
 def test_get_partner_rating_avg_and_count(client, monkeypatch):
@@ -122,6 +127,7 @@ def test_get_partner_rating_avg_and_count(client, monkeypatch):
     assert body["partner_id"] == "p1"
     assert body["count"] == 2
     assert abs(body["avg_rating"] - 3.0) < 1e-9
+    assert body["distribution"] == {"1": 0, "2": 1, "3": 0, "4": 1, "5": 0}
 
 
 def test_get_partners_ratings_bulk_includes_missing(client, monkeypatch):
@@ -166,3 +172,256 @@ def test_tenant_isolation_same_order_id_ok_in_different_tenants(app_and_engine,
 
     assert r_a.status_code == 201, r_a.text
     assert r_b.status_code == 201, r_b.text
+
+
+def test_rebuild_ratings_matches_reviews(client, monkeypatch, app_and_engine):
+    import app.main as main_mod
+    from app.cli import main as cli_main
+    from app.database import get_db_session
+    from app.models import PartnerRating
+
+    monkeypatch.setattr(
+        main_mod,
+        "get_order_by_id",
+        lambda order_id, tenant_id=None: FakeResp(FakeOrder(user_id="user-1", partner_id="p-rebuild")),
+    )
+
+    for order_id, rating in [(40, 1), (41, 5), (42, 5)]:
+        client.post("/reviews", json={"order_id": order_id, "user_id": "user-1", "rating": rating, "comment": None})
+
+    with get_db_session(schema="public") as db:
+        db.execute(PartnerRating.__table__.delete())
+        db.commit()
+
+    assert cli_main(["rebuild-ratings", "--schema", "public"]) == 0
+
+    body = client.get("/partners/p-rebuild/rating").json()
+    assert body["count"] == 3
+    assert abs(body["avg_rating"] - 11 / 3) < 1e-9
+    assert body["distribution"] == {"1": 1, "2": 0, "3": 0, "4": 0, "5": 2}
+
+
+def test_rating_cache_invalidated_on_create(client, monkeypatch):
+    import app.main as main_mod
+
+    monkeypatch.setattr(
+        main_mod,
+        "get_order_by_id",
+        lambda order_id, tenant_id=None: FakeResp(FakeOrder(user_id="user-1", partner_id="p-cache")),
+    )
+
+    assert client.get("/partners/ratings", params={"partner_ids": "p-cache"}).json()["p-cache"]["count"] == 0
+    # Served from the entry the batch read cached, validators included.
+    before = client.get("/partners/p-cache/rating")
+    assert (before.json()["count"], before.headers["ETag"]) == (0, '"0"')
+
+    client.post("/reviews", json={"order_id": 50, "user_id": "user-1", "rating": 4, "comment": None})
+
+    after = client.get("/partners/p-cache/rating")
+    assert after.json()["count"] == 1
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert client.get("/partners/ratings", params={"partner_ids": "p-cache"}).json()["p-cache"]["count"] == 1
+    assert client.get("/partners/p-cache/rating", headers={"x-tenant-id": "tenant_a"}).json()["count"] == 0
+
+
+def test_list_partner_reviews_keyset_pagination(client, monkeypatch):
+    import app.main as main_mod
+
+    monkeypatch.setattr(
+        main_mod,
+        "get_order_by_id",
+        lambda order_id, tenant_id=None: FakeResp(FakeOrder(user_id="user-1", partner_id="p-page")),
+    )
+
+    for order_id in range(60, 65):
+        client.post("/reviews", json={"order_id": order_id, "user_id": "user-1", "rating": 3, "comment": "x"})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/partners/p-page/reviews", params=params)
+        assert r.status_code == 200
+        seen.extend(item["order_id"] for item in r.json())
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert seen == [64, 63, 62, 61, 60]
+
+
+def test_list_partner_reviews_field_projection(client, mock_order_ok):
+    client.post("/reviews", json={"order_id": 70, "user_id": "user-1", "rating": 5, "comment": "great"})
+
+    r = client.get("/partners/partner-1/reviews", params={"fields": "rating,comment"})
+    assert r.status_code == 200
+    assert r.json() == [{"rating": 5, "comment": "great"}]
+
+    r = client.get("/partners/partner-1/reviews", params={"fields": "rating,secret"})
+    assert r.status_code == 400
+
+    r = client.get("/partners/partner-1/reviews", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+def test_create_reviews_batch_reports_per_item_status(client, monkeypatch):
+    import app.main as main_mod
+
+    orders = {
+        80: FakeOrder(user_id="user-1", partner_id="p-batch"),
+        81: FakeOrder(user_id="user-1", partner_id="p-batch"),
+        82: FakeOrder(user_id="user-1", partner_id=None, has_partner_field=False),
+    }
+    monkeypatch.setattr(main_mod, "get_orders_by_ids", lambda order_ids, tenant_id=None: {
+        oid: orders[oid] for oid in order_ids if oid in orders
+    })
+    monkeypatch.setattr(main_mod, "get_order_by_id", lambda order_id, tenant_id=None: FakeResp(orders[order_id]))
+
+    assert client.post("/reviews", json={"order_id": 80, "user_id": "user-1", "rating": 1}).status_code == 201
+
+    reviews = [
+        {"order_id": 80, "user_id": "user-1", "rating": 5},
+        {"order_id": 81, "user_id": "user-1", "rating": 4},
+        {"order_id": 81, "user_id": "user-1", "rating": 2},
+        {"order_id": 82, "user_id": "user-1", "rating": 3},
+        {"order_id": 83, "user_id": "user-1", "rating": 3},
+    ]
+    r = client.post("/reviews:batch", json={"reviews": reviews})
+    assert r.status_code == 200, r.text
+    body = r.json()
+
+    assert body["created"] == 1
+    assert [item["status"] for item in body["items"]] == [
+        "duplicate", "created", "duplicate", "missing_partner", "order_not_found",
+    ]
+    assert body["items"][1]["id"]
+
+    rating = client.get("/partners/p-batch/rating").json()
+    assert rating["count"] == 2
+    assert rating["distribution"]["4"] == 1
+
+
+def test_create_reviews_batch_too_large_413(client, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "review_batch_max", 1)
+    reviews = [{"order_id": i, "user_id": "user-1", "rating": 5} for i in (90, 91)]
+
+    r = client.post("/reviews:batch", json={"reviews": reviews})
+    assert r.status_code == 413
+
+
+def test_create_review_duplicate_409_without_order_lookup(client, monkeypatch):
+    import app.main as main_mod
+
+    calls = []
+
+    def _fake(order_id, tenant_id=None):
+        calls.append(order_id)
+        return FakeResp(FakeOrder(user_id="user-1", partner_id="p-dup"))
+
+    monkeypatch.setattr(main_mod, "get_order_by_id", _fake)
+    monkeypatch.setattr("app.orders.order_cache.maxsize", 0)
+
+    payload = {"order_id": 120, "user_id": "user-1", "rating": 5}
+    assert client.post("/reviews", json=payload).status_code == 201
+
+    r = client.post("/reviews", json=payload)
+    assert r.status_code == 409
+    assert r.json()["detail"] == "Order already reviewed"
+    assert calls == [120]
+
+
+def test_create_review_idempotency_key_replays_stored_review(client, monkeypatch):
+    import app.main as main_mod
+
+    calls = []
+
+    def _fake(order_id, tenant_id=None):
+        calls.append(order_id)
+        return FakeResp(FakeOrder(user_id="user-1", partner_id="p-idem"))
+
+    monkeypatch.setattr(main_mod, "get_order_by_id", _fake)
+
+    payload = {"order_id": 121, "user_id": "user-1", "rating": 4}
+    headers = {"Idempotency-Key": "key-121"}
+
+    first = client.post("/reviews", json=payload, headers=headers)
+    assert first.status_code == 201
+
+    retry = client.post("/reviews", json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert calls == [121]
+
+    other = client.post("/reviews", json={**payload, "order_id": 122}, headers=headers)
+    assert other.status_code == 422
+
+    assert client.get("/partners/p-idem/rating").json()["count"] == 1
+
+
+def test_unknown_and_invalid_tenant_rejected(client):
+    r = client.get("/partners/p1/rating", headers={"x-tenant-id": "no_such_tenant"})
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Unknown tenant"
+
+    r = client.get("/partners/p1/rating", headers={"x-tenant-id": "public; DROP TABLE reviews"})
+    assert r.status_code == 400
+
+
+def test_review_ids_are_time_ordered_uuid7(client, mock_order_ok):
+    import uuid
+
+    first = client.post("/reviews", json={"order_id": 140, "user_id": "user-1", "rating": 5}).json()
+    second = client.post("/reviews", json={"order_id": 141, "user_id": "user-1", "rating": 5}).json()
+
+    assert uuid.UUID(first["id"]).version == 7
+    assert first["id"] < second["id"]
+
+
+def test_list_partner_reviews_serializes_like_review_out(client, mock_order_ok):
+    created = client.post("/reviews", json={"order_id": 95, "user_id": "user-1", "rating": 4, "comment": "line\nwith \"quotes\""})
+    assert created.status_code == 201
+
+    r = client.get("/partners/partner-1/reviews")
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == [created.json()]
+
+
+def test_partner_endpoints_answer_conditional_gets(client, monkeypatch):
+    import app.main as main_mod
+
+    monkeypatch.setattr(
+        main_mod,
+        "get_order_by_id",
+        lambda order_id, tenant_id=None: FakeResp(FakeOrder(user_id="user-1", partner_id="p-etag")),
+    )
+
+    empty = client.get("/partners/p-etag/rating")
+    assert empty.headers["ETag"] == '"0"'
+    assert "Last-Modified" not in empty.headers
+
+    client.post("/reviews", json={"order_id": 96, "user_id": "user-1", "rating": 5})
+
+    for path in ["/partners/p-etag/rating", "/partners/p-etag/reviews"]:
+        first = client.get(path)
+        etag = first.headers["ETag"]
+        assert etag != '"0"'
+        assert first.headers["Vary"] == "X-Tenant-Id"
+        assert "must-revalidate" in first.headers["Cache-Control"]
+
+        cached = client.get(path, headers={"If-None-Match": f'W/{etag}, "other"'})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+
+        since = client.get(path, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+        assert since.status_code == 304
+
+    client.post("/reviews", json={"order_id": 97, "user_id": "user-1", "rating": 1})
+    changed = client.get("/partners/p-etag/rating", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["count"] == 2
@@ -0,0 +1,66 @@
+from tests.conftest import FakeOrder, FakeResp
+
+COMMENTS = {
+    1: (5, "p1", "Great pizza, fast delivery"),
+    2: (4, "p1", "pizza was cold but the delivery was fast"),
+    3: (2, "p2", "cold pizza cold pizza cold pizza"),
+    4: (1, "p2", "never again"),
+    5: (5, "p2", None),
+}
+
+
+def _seed(client, monkeypatch):
+    import app.main as main_mod
+
+    partners = {order_id: partner for order_id, (_, partner, _) in COMMENTS.items()}
+    monkeypatch.setattr(
+        main_mod,
+        "get_order_by_id",
+        lambda order_id, tenant_id=None: FakeResp(FakeOrder(user_id="user-1", partner_id=partners[order_id])),
+    )
+    for order_id, (rating, _, comment) in COMMENTS.items():
+        r = client.post("/reviews", json={"order_id": order_id, "user_id": "user-1", "rating": rating, "comment": comment})
+        assert r.status_code == 201
+
+
+def _orders(r):
+    assert r.status_code == 200
+    return [hit["order_id"] for hit in r.json()]
+
+
+def test_search_ranks_and_filters(client, monkeypatch):
+    _seed(client, monkeypatch)
+
+    r = client.get("/reviews/search", params={"q": "cold pizza"})
+    assert _orders(r) == [3, 2]
+    hits = r.json()
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert hits[0]["comment"] == COMMENTS[3][2]
+
+    assert _orders(client.get("/reviews/search", params={"q": "pizza -cold"})) == [1]
+    assert _orders(client.get("/reviews/search", params={"q": '"fast delivery"'})) == [1]
+    assert sorted(_orders(client.get("/reviews/search", params={"q": "PIZZA", "partner_id": "p1"}))) == [1, 2]
+    assert _orders(client.get("/reviews/search", params={"q": "pizza", "min_rating": 3, "max_rating": 4})) == [2]
+    assert _orders(client.get("/reviews/search", params={"q": "pizza", "created_to": "2000-01-01T00:00:00"})) == []
+    assert _orders(client.get("/reviews/search", params={"q": "?!"})) == []
+
+    # Search is tenant-scoped.
+    assert _orders(client.get("/reviews/search", params={"q": "pizza"}, headers={"x-tenant-id": "tenant_a"})) == []
+
+
+def test_search_keyset_pagination(client, monkeypatch):
+    _seed(client, monkeypatch)
+    expected = _orders(client.get("/reviews/search", params={"q": "pizza or again"}))
+    assert sorted(expected) == [1, 2, 3, 4]
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "pizza or again", "limit": 1, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/reviews/search", params=params)
+        seen += _orders(r)
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == expected
+    assert client.get("/reviews/search", params={"q": "pizza", "cursor": "nope"}).status_code == 400
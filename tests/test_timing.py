@@ -0,0 +1,52 @@
+def _server_timing(response) -> dict:
+    phases = {}
+    for part in response.headers["server-timing"].split(","):
+        name, _, rest = part.strip().partition(";")
+        phases[name] = rest
+    return phases
+
+
+def test_server_timing_header_breaks_down_create_review(client, mock_order_ok, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "server_timing_enabled", True)
+
+    r = client.post("/reviews", json={"order_id": 130, "user_id": "user-1", "rating": 5})
+    assert r.status_code == 201
+
+    phases = _server_timing(r)
+    for name in ("orders_grpc", "insert_commit", "db", "serialize"):
+        assert phases[name].startswith("dur=")
+    assert int(phases["db_queries"].split('"')[1]) >= 3
+
+
+def test_server_timing_header_disabled_by_default(client):
+    r = client.get("/partners/p1/rating")
+    assert r.status_code == 200
+    assert "server-timing" not in r.headers
+
+
+def test_phase_histograms_use_route_template(client, mock_order_ok):
+    from prometheus_client import REGISTRY
+
+    client.post("/reviews", json={"order_id": 131, "user_id": "user-1", "rating": 5})
+
+    count = REGISTRY.get_sample_value(
+        "request_db_queries_count", {"endpoint": "/reviews", "tenant": "public"}
+    )
+    assert count and count >= 1
+
+
+def test_rejected_tenant_ids_do_not_take_labels(client):
+    from prometheus_client import REGISTRY
+
+    assert client.get("/partners/p1/rating", headers={"x-tenant-id": "no_such_tenant"}).status_code == 404
+    assert client.get("/partners/p1/rating", headers={"x-tenant-id": "Bad-Id!"}).status_code == 400
+
+    def count(tenant):
+        return REGISTRY.get_sample_value(
+            "request_db_queries_count", {"endpoint": "/partners/{partner_id}/rating", "tenant": tenant}
+        )
+
+    assert count("invalid") >= 2
+    assert count("no_such_tenant") is None
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+
+def _post(client, order_id, rating):
+    r = client.post("/reviews", json={"order_id": order_id, "user_id": "user-1", "rating": rating})
+    assert r.status_code == 201
+
+
+def test_trend_is_updated_on_write_and_fills_gaps(client, mock_order_ok):
+    _post(client, 1, 5)
+    _post(client, 2, 2)
+
+    today = datetime.utcnow().date()
+    r = client.get("/partners/partner-1/rating/trend", params={"from": (today - timedelta(days=2)).isoformat()})
+    assert r.status_code == 200
+    series = r.json()
+    assert [point["bucket_start"] for point in series] == [
+        (today - timedelta(days=d)).isoformat() for d in (2, 1, 0)
+    ]
+    assert series[0] == {
+        "bucket_start": series[0]["bucket_start"],
+        "avg_rating": 0.0,
+        "count": 0,
+        "distribution": {str(star): 0 for star in range(1, 6)},
+    }
+    assert series[-1]["count"] == 2
+    assert series[-1]["avg_rating"] == 3.5
+    assert series[-1]["distribution"]["5"] == 1
+
+    month = client.get("/partners/partner-1/rating/trend", params={"granularity": "month"}).json()
+    assert len(month) == 30
+    assert month[-1]["bucket_start"] == today.replace(day=1).isoformat()
+    assert month[-1]["count"] == 2
+
+
+def test_rebuild_rollups_backfills_buckets(client, mock_order_ok, app_and_engine):
+    from app.cli import main
+
+    _, engine = app_and_engine
+    for order_id, rating in enumerate([4, 2, 5], start=1):
+        _post(client, order_id, rating)
+    # Move two reviews into an earlier week of January 2024 (Monday the 8th and Sunday the 14th).
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE public.reviews SET created_at = '2024-01-08 10:00' WHERE order_id = 1"))
+        conn.execute(text("UPDATE public.reviews SET created_at = '2024-01-14 23:00' WHERE order_id = 2"))
+
+    assert main(["rebuild-rollups", "--schema", "public"]) == 0
+
+    params = {"granularity": "week", "from": "2024-01-03", "to": "2024-01-20"}
+    weeks = client.get("/partners/partner-1/rating/trend", params=params).json()
+    assert [(w["bucket_start"], w["count"], w["avg_rating"]) for w in weeks] == [
+        ("2024-01-01", 0, 0.0),
+        ("2024-01-08", 2, 3.0),
+        ("2024-01-15", 0, 0.0),
+    ]
+
+    params = {"granularity": "month", "from": "2023-12-31", "to": "2024-02-01"}
+    months = client.get("/partners/partner-1/rating/trend", params=params).json()
+    assert [(m["bucket_start"], m["count"]) for m in months] == [("2023-12-01", 0), ("2024-01-01", 2), ("2024-02-01", 0)]
+
+    today = client.get("/partners/partner-1/rating/trend", params={"from": datetime.utcnow().date().isoformat()}).json()
+    assert sum(point["count"] for point in today) == 1
+
+
+def test_trend_rejects_bad_ranges(client):
+    url = "/partners/partner-1/rating/trend"
+    assert client.get(url, params={"from": "2024-02-01", "to": "2024-01-01"}).status_code == 400
+    assert client.get(url, params={"from": "2020-01-01", "to": "2024-01-01"}).status_code == 400
+    assert client.get(url, params={"granularity": "week", "from": "2020-01-01", "to": "2024-01-01"}).status_code == 200
+    assert client.get(url, params={"granularity": "year"}).status_code == 422
+
+
+def test_trend_at_the_ends_of_the_date_range(client):
+    url = "/partners/partner-1/rating/trend"
+    for granularity in ("day", "week", "month"):
+        latest = client.get(url, params={"granularity": granularity, "to": "9999-12-31"})
+        assert latest.status_code == 200
+        assert len(latest.json()) == 30
+
+        earliest = client.get(url, params={"granularity": granularity, "to": "0001-01-03"})
+        assert earliest.status_code == 200
+        assert earliest.json()[0]["bucket_start"] == "0001-01-01"
@@ -0,0 +1,77 @@
+from sqlalchemy import text
+
+from tests.conftest import FakeOrder, FakeResp
+
+
+def _seed(client, monkeypatch, reviews):
+    import app.main as main_mod
+
+    users = {order_id: user_id for order_id, user_id in reviews}
+    monkeypatch.setattr(
+        main_mod,
+        "get_order_by_id",
+        lambda order_id, tenant_id=None: FakeResp(FakeOrder(user_id=users[order_id], partner_id="p1")),
+    )
+    for order_id, user_id in reviews:
+        r = client.post("/reviews", json={"order_id": order_id, "user_id": user_id, "rating": 4})
+        assert r.status_code == 201
+
+
+def test_list_user_reviews_keyset_pagination(client, monkeypatch):
+    _seed(client, monkeypatch, [(i, "user-1") for i in range(1, 8)] + [(100, "user-2")])
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/users/user-1/reviews", params=params)
+        assert r.status_code == 200
+        seen += [review["order_id"] for review in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == list(range(7, 0, -1))
+    assert [review["order_id"] for review in client.get("/users/user-2/reviews").json()] == [100]
+    assert client.get("/users/user-1/reviews", headers={"x-tenant-id": "tenant_a"}).json() == []
+    assert client.get("/users/user-1/reviews", params={"cursor": "nope"}).status_code == 400
+
+
+def test_lookup_reports_reviewed_orders_in_input_order(client, monkeypatch, app_and_engine):
+    from sqlalchemy import event
+
+    _seed(client, monkeypatch, [(1, "user-1"), (3, "user-1")])
+    ids = {review["order_id"]: review["id"] for review in client.get("/users/user-1/reviews").json()}
+
+    _, engine = app_and_engine
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        r = client.post("/reviews:lookup", json={"order_ids": [3, 2, 1, 3]})
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert r.status_code == 200
+    assert r.json()["items"] == [
+        {"order_id": 3, "reviewed": True, "id": ids[3]},
+        {"order_id": 2, "reviewed": False, "id": None},
+        {"order_id": 1, "reviewed": True, "id": ids[1]},
+        {"order_id": 3, "reviewed": True, "id": ids[3]},
+    ]
+    assert len([s for s in statements if "FROM reviews" in s]) == 1
+
+    assert client.post("/reviews:lookup", json={"order_ids": []}).status_code == 422
+    assert client.post("/reviews:lookup", json={"order_ids": list(range(1001))}).status_code == 413
+
+
+def test_order_id_constraint_covers_review_id(app_and_engine):
+    _, engine = app_and_engine
+    with engine.connect() as conn:
+        definition = conn.execute(text(
+            "SELECT pg_get_indexdef(c.conindid) FROM pg_constraint c "
+            "WHERE c.conname = 'uq_reviews_order_id' AND c.connamespace = 'tenant_a'::regnamespace"
+        )).scalar_one()
+    assert definition.endswith("(order_id) INCLUDE (id)")
@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.write_behind import QueueFull, ReviewWriteQueue, flush_tenant
+
+
+@pytest.fixture()
+def writer(monkeypatch, tmp_path):
+    import app.main as main_mod
+
+    release = threading.Event()
+    release.set()
+
+    def _flush(tenant_id, rows):
+        release.wait(5)
+        return flush_tenant(tenant_id, rows)
+
+    queue = ReviewWriteQueue(maxsize=2, batch_size=10, linger=0, spill_path=str(tmp_path / "spill.jsonl"), flush=_flush)
+    queue.release = release
+    monkeypatch.setattr(main_mod, "review_writer", queue)
+    queue.start()
+    yield queue
+    release.set()
+    queue.stop(5)
+
+
+def _count(engine, order_id):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM public.reviews WHERE order_id = :o"), {"o": order_id}).scalar_one()
+
+
+def test_queued_review_is_accepted_and_flushed(client, app_and_engine, mock_order_ok, writer):
+    _, engine = app_and_engine
+
+    r = client.post("/reviews", json={"order_id": 501, "user_id": "user-1", "rating": 4})
+    assert r.status_code == 202, r.text
+    assert r.json()["status"] == "accepted"
+
+    assert writer.join(5)
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT id::text FROM public.reviews WHERE order_id = 501")).scalar_one()
+    assert stored == r.json()["id"]
+    assert client.get("/partners/partner-1/rating").json()["count"] == 1
+    with open(writer._segment_path(writer._active)) as f:
+        assert f.read() == ""
+
+
+def test_pending_duplicates_and_idempotent_replay(client, app_and_engine, mock_order_ok, writer):
+    _, engine = app_and_engine
+    writer.release.clear()
+
+    payload = {"order_id": 502, "user_id": "user-1", "rating": 5}
+    first = client.post("/reviews", json=payload, headers={"Idempotency-Key": "k-502"})
+    assert first.status_code == 202
+    replay = client.post("/reviews", json=payload, headers={"Idempotency-Key": "k-502"})
+    assert replay.status_code == 202
+    assert replay.json()["id"] == first.json()["id"]
+    assert client.post("/reviews", json=payload).status_code == 409
+
+    writer.release.set()
+    assert writer.join(5)
+    assert _count(engine, 502) == 1
+    assert client.post("/reviews", json=payload).status_code == 409
+
+
+def test_pending_idempotency_key_reused_for_another_order(client, app_and_engine, mock_order_ok, writer):
+    _, engine = app_and_engine
+    writer.release.clear()
+
+    headers = {"Idempotency-Key": "k-503"}
+    first = client.post("/reviews", json={"order_id": 503, "user_id": "user-1", "rating": 5}, headers=headers)
+    assert first.status_code == 202
+    reused = client.post("/reviews", json={"order_id": 504, "user_id": "user-1", "rating": 5}, headers=headers)
+    assert reused.status_code == 422
+
+    writer.release.set()
+    assert writer.join(5)
+    assert _count(engine, 503) == 1
+    assert client.post("/reviews", json={"order_id": 504, "user_id": "user-1", "rating": 5}, headers=headers).status_code == 422
+
+
+def test_full_queue_returns_503_with_retry_after(client, mock_order_ok, writer):
+    writer.release.clear()
+
+    first = client.post("/reviews", json={"order_id": 510, "user_id": "user-1", "rating": 3})
+    assert first.status_code == 202
+    deadline = time.monotonic() + 5
+    while writer.in_flight == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    statuses = []
+    for order_id in range(511, 515):
+        r = client.post("/reviews", json={"order_id": order_id, "user_id": "user-1", "rating": 3})
+        statuses.append(r.status_code)
+        if r.status_code == 503:
+            assert r.headers["Retry-After"] == "1"
+    # One batch in flight plus maxsize queued.
+    assert statuses.count(202) == 2
+    assert statuses.count(503) == 2
+
+
+def test_spill_file_is_replayed_on_start(app_and_engine, tmp_path):
+    _, engine = app_and_engine
+    spill = tmp_path / "spill.jsonl"
+    segment = tmp_path / "spill.jsonl.0"
+    row = {
+        "id": "01890a5d-ac96-774b-bcce-b302099a8057",
+        "order_id": 520,
+        "user_id": "user-1",
+        "partner_id": "partner-9",
+        "rating": 2,
+        "comment": None,
+        "idempotency_key": None,
+    }
+    segment.write_text(json.dumps({"tenant": "public", "row": row}) + "\n" + '{"tenant": "pub')
+
+    queue = ReviewWriteQueue(maxsize=10, batch_size=10, linger=0, spill_path=str(spill))
+    queue.start()
+    assert queue.join(5)
+    assert queue.stop(5)
+
+    assert _count(engine, 520) == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spill_replay_respects_the_queue_bound(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    for segment in range(3):
+        entries = [
+            {"tenant": "public", "row": {"order_id": segment * 2 + i, "idempotency_key": None}}
+            for i in range(2)
+        ]
+        (tmp_path / f"spill.jsonl.{segment}").write_text("".join(json.dumps(e) + "\n" for e in entries))
+
+    depths, written = [], []
+    release = threading.Event()
+
+    def _flush(tenant_id, rows):
+        release.wait(5)
+        depths.append(len(queue._items))
+        written.extend(row["order_id"] for row in rows)
+        # Flushed segments are deleted before the next batch is taken.
+        assert len(list(tmp_path.iterdir())) <= 4
+        return rows
+
+    queue = ReviewWriteQueue(maxsize=2, batch_size=2, linger=0, spill_path=str(spill), flush=_flush)
+    queue.start()
+    assert len(queue) == 2
+    # New reviews wait until the replay backlog is in the queue.
+    with pytest.raises(QueueFull):
+        queue.submit("public", {"order_id": 99, "idempotency_key": None})
+    release.set()
+    assert queue.join(5)
+
+    assert written == list(range(6))
+    assert max(depths) <= 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["spill.jsonl.3"]
+    queue.submit("public", {"order_id": 99, "idempotency_key": None})
+    assert queue.join(5)
+    assert queue.stop(5)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_row_the_database_rejects_does_not_block_the_queue(app_and_engine, tmp_path):
+    _, engine = app_and_engine
+    dead_letter = tmp_path / "dead.jsonl"
+    row = {
+        "order_id": 530,
+        "user_id": "user-1",
+        "partner_id": "partner-9",
+        "rating": 4,
+        "comment": None,
+        "idempotency_key": None,
+    }
+    bad = {**row, "id": "01890a5d-ac96-774b-bcce-b302099a8060", "user_id": "u" * 40}
+    good = {**row, "id": "01890a5d-ac96-774b-bcce-b302099a8061", "order_id": 531}
+
+    queue = ReviewWriteQueue(maxsize=10, batch_size=10, linger=0.05, dead_letter_path=str(dead_letter))
+    queue.submit("public", bad)
+    queue.submit("public", good)
+    queue.start()
+    assert queue.join(5)
+    assert queue.stop(5)
+
+    assert _count(engine, 530) == 0
+    assert _count(engine, 531) == 1
+    [entry] = [json.loads(line) for line in dead_letter.read_text().splitlines()]
+    assert entry["row"]["order_id"] == 530
+    assert queue.pending("public", 530) is None
+
+
+def test_user_id_longer_than_column_is_rejected(client, mock_order_ok):
+    r = client.post("/reviews", json={"order_id": 532, "user_id": "u" * 40, "rating": 4})
+    assert r.status_code == 422